@@ -45,43 +45,29 @@ def main():
         print(f"Error: Input file '{args.input}' not found", file=sys.stderr)
         sys.exit(1)
 
-    # Import FOREST module
-    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'repo', 'FOREST2020'))
+    # Import FOREST functions from the self-contained scripts in-process
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    from motif_extraction import run_motif_extraction
+    from lib.forest_core import save_fasta_results
 
-    # Build command for FOREST
-    import subprocess
-
-    cmd = [
-        sys.executable,
-        'repo/FOREST2020/FOREST.py',
-        args.input,
-        '-L', str(args.max_length)
-    ]
-
-    print(f"Running command: {' '.join(cmd)}")
     print(f"Input file: {args.input}")
     print(f"Max length: {args.max_length}")
     print("-" * 50)
 
     try:
+        result = run_motif_extraction(
+            input_file=args.input,
+            output_file=args.output,
+            max_length=args.max_length
+        )
+
         if args.output:
-            with open(args.output, 'w') as f:
-                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True, check=True)
             print(f"Results saved to: {args.output}")
         else:
-            result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True, check=True)
+            save_fasta_results(result['motifs'])
 
-        if result.stderr:
-            print("Warnings/Errors:", file=sys.stderr)
-            print(result.stderr, file=sys.stderr)
-
-    except subprocess.CalledProcessError as e:
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error running FOREST: {e}", file=sys.stderr)
-        if e.stderr:
-            print(f"Error details: {e.stderr}", file=sys.stderr)
-        sys.exit(1)
-    except FileNotFoundError:
-        print("Error: Python interpreter not found", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
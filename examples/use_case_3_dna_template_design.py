@@ -60,21 +60,11 @@ def main():
             print(f"Error: {name} file '{file_path}' not found", file=sys.stderr)
             sys.exit(1)
 
-    # Build command for FOREST
-    import subprocess
-
-    cmd = [
-        sys.executable,
-        'repo/FOREST2020/FOREST.py',
-        args.input,
-        '--library',
-        '--barcodes', args.barcodes,
-        '--templates',
-        '-bn', str(args.num_barcodes),
-        '-L', str(args.max_length)
-    ]
-
-    print(f"Running command: {' '.join(cmd)}")
+    # Import FOREST functions from the self-contained scripts in-process
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    from dna_template_design import run_dna_template_design
+    from lib.forest_core import save_fasta_results
+
     print(f"Input file: {args.input}")
     print(f"Barcodes file: {args.barcodes}")
     print(f"Number of barcodes: {args.num_barcodes}")
@@ -83,24 +73,21 @@ def main():
     print("-" * 50)
 
     try:
+        result = run_dna_template_design(
+            input_file=args.input,
+            barcodes_file=args.barcodes,
+            output_file=args.output,
+            num_barcodes=args.num_barcodes,
+            max_length=args.max_length
+        )
+
         if args.output:
-            with open(args.output, 'w') as f:
-                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True, check=True)
             print(f"Results saved to: {args.output}")
         else:
-            result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True, check=True)
+            save_fasta_results(result['templates'])
 
-        if result.stderr:
-            print("Warnings/Errors:", file=sys.stderr)
-            print(result.stderr, file=sys.stderr)
-
-    except subprocess.CalledProcessError as e:
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error running FOREST: {e}", file=sys.stderr)
-        if e.stderr:
-            print(f"Error details: {e.stderr}", file=sys.stderr)
-        sys.exit(1)
-    except FileNotFoundError:
-        print("Error: Python interpreter not found", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -14,35 +14,14 @@ Usage:
 import argparse
 import sys
 import os
-import subprocess
 
-def run_forest_command(cmd, description, output_file=None):
-    """Run a FOREST command with proper error handling"""
-    print(f"\n=== {description} ===")
-    print(f"Command: {' '.join(cmd)}")
-
-    try:
-        if output_file:
-            with open(output_file, 'w') as f:
-                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, text=True, check=True)
-            print(f"✓ Results saved to: {output_file}")
-        else:
-            print("Output:")
-            result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True, check=True)
-
-        if result.stderr:
-            print(f"Warnings: {result.stderr}")
-
-        return True
-
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Error: {e}")
-        if e.stderr:
-            print(f"Details: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        print("✗ Error: Python interpreter not found")
-        return False
+# FOREST phases keyed on the result they produce: (step name, output file name)
+WORKFLOW_PHASES = {
+    "motifs": ("Motif Extraction", "motifs.txt"),
+    "rna_library": ("RNA Library Design", "rna_library.txt"),
+    "dna_templates": ("DNA Template Design", "dna_templates.txt"),
+    "array_barcodes": ("Microarray Design", "microarray_barcodes.txt"),
+}
 
 def main():
     parser = argparse.ArgumentParser(
@@ -101,46 +80,27 @@ def main():
     print(f"Max length: {args.max_length}")
     print(f"Output directory: {args.output_dir}")
 
-    base_cmd = [
-        sys.executable,
-        'repo/FOREST2020/FOREST.py',
-        args.input,
-        '-L', str(args.max_length)
-    ]
+    # Import FOREST functions from the self-contained scripts in-process
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+    from comprehensive_workflow import run_comprehensive_workflow
 
-    # Step 1: Motif Extraction
-    motif_cmd = base_cmd.copy()
-    motif_output = os.path.join(args.output_dir, 'motifs.txt')
-    success1 = run_forest_command(motif_cmd, "1. Motif Extraction", motif_output)
+    # All four phases share a single parsed FASTA and barcode list in memory
+    try:
+        result = run_comprehensive_workflow(
+            input_file=args.input,
+            barcodes_file=args.barcodes,
+            output_dir=args.output_dir,
+            num_barcodes=args.num_barcodes,
+            max_length=args.max_length
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Error: {e}")
+        result = None
 
-    # Step 2: RNA Library Design
-    library_cmd = base_cmd + [
-        '--library',
-        '--barcodes', args.barcodes,
-        '-bn', str(args.num_barcodes)
-    ]
-    library_output = os.path.join(args.output_dir, 'rna_library.txt')
-    success2 = run_forest_command(library_cmd, "2. RNA Library Design", library_output)
-
-    # Step 3: DNA Template Design
-    template_cmd = base_cmd + [
-        '--library',
-        '--barcodes', args.barcodes,
-        '--templates',
-        '-bn', str(args.num_barcodes)
-    ]
-    template_output = os.path.join(args.output_dir, 'dna_templates.txt')
-    success3 = run_forest_command(template_cmd, "3. DNA Template Design", template_output)
-
-    # Step 4: Microarray Design
-    array_cmd = base_cmd + [
-        '--library',
-        '--barcodes', args.barcodes,
-        '--array',
-        '-bn', str(args.num_barcodes)
-    ]
-    array_output = os.path.join(args.output_dir, 'microarray_barcodes.txt')
-    success4 = run_forest_command(array_cmd, "4. Microarray Design", array_output)
+    for step, (key, (step_name, _)) in enumerate(WORKFLOW_PHASES.items(), 1):
+        print(f"\n=== {step}. {step_name} ===")
+        if result is not None:
+            print(f"✓ {len(result[key])} records saved to: {result['output_files'][key]}")
 
     # Summary
     print("\n" + "=" * 50)
@@ -148,10 +108,8 @@ def main():
     print("=" * 50)
 
     steps = [
-        ("Motif Extraction", success1, motif_output),
-        ("RNA Library Design", success2, library_output),
-        ("DNA Template Design", success3, template_output),
-        ("Microarray Design", success4, array_output)
+        (step_name, result is not None, os.path.join(args.output_dir, file_name))
+        for step_name, file_name in WORKFLOW_PHASES.values()
     ]
 
     all_success = True
@@ -8,6 +8,7 @@ Dependencies Removed: subprocess calls to FOREST.py, repo path dependencies
 
 Usage:
     python scripts/comprehensive_workflow.py --input <input_file> --barcodes <barcodes_file> --output_dir <output_dir>
+    python scripts/comprehensive_workflow.py --inputs <file1,file2,...> --barcodes <barcodes_file> --output_dir <output_dir>
 
 Example:
     python scripts/comprehensive_workflow.py --input examples/data/test.fa.txt --barcodes examples/data/barcode25mer_100000.txt --num_barcodes 2 --output_dir results/comprehensive
@@ -17,19 +18,26 @@ Example:
 # Minimal Imports (only essential packages)
 # ==============================================================================
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Union, Optional, Dict, Any, List
+from typing import Union, Optional, Dict, Any, List, Sequence
 import json
 import sys
 
 # Add scripts/lib to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from lib.forest_core import (
-    terminal_motif_extraction,
+    extract_all_motifs,
+    iter_file_results,
     parse_fasta_with_structure,
     load_barcodes,
-    conjugate_stem,
+    STEM_FORWARD,
+    STEM_REVERSE,
     revcom,
+    revcom_many,
+    dna_to_rna,
+    dna_to_rna_many,
     save_fasta_results
 )
 
@@ -38,6 +46,7 @@ from lib.forest_core import (
 # ==============================================================================
 DEFAULT_CONFIG = {
     "max_length": 134,
+    "jobs": 1,
     "num_barcodes": 2,
     "barcode_prefix": "GGG",
     "stem_length": 17,
@@ -84,6 +93,9 @@ def run_comprehensive_workflow(
     barcodes_file = Path(barcodes_file)
     config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
 
+    if config['num_barcodes'] < 0:
+        raise ValueError(f"num_barcodes must be non-negative, got {config['num_barcodes']}")
+
     # Validate input files
     if not input_file.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
@@ -96,8 +108,10 @@ def run_comprehensive_workflow(
     except Exception as e:
         raise ValueError(f"Failed to parse input file: {e}")
 
+    # Only the first barcode is read for now; the rest are loaded once the
+    # number the motifs consume is known
     try:
-        barcodes = load_barcodes(barcodes_file)
+        barcodes = load_barcodes(barcodes_file, max_barcodes=1)
     except Exception as e:
         raise ValueError(f"Failed to parse barcodes file: {e}")
 
@@ -111,125 +125,172 @@ def run_comprehensive_workflow(
     # ==============================================================================
     print("Step 1: Extracting terminal motifs...", file=sys.stderr)
 
-    all_motifs = {}
-    processed_sequences = 0
-
-    for name, sequence, structure in parsed_data:
-        try:
-            motifs = terminal_motif_extraction(
-                name=name.lstrip('>'),  # Remove '>' prefix
-                seq=structure,
-                seq2=sequence,
-                max_length=config['max_length']
-            )
-            all_motifs.update(motifs)
-            processed_sequences += 1
-        except Exception as e:
-            print(f"Warning: Failed to process sequence {name}: {e}", file=sys.stderr)
-            continue
+    all_motifs, processed_sequences = extract_all_motifs(
+        parsed_data,
+        max_length=config['max_length'],
+        jobs=config['jobs']
+    )
 
     print(f"  ✅ Extracted {len(all_motifs)} motifs from {processed_sequences} sequences", file=sys.stderr)
 
-    # ==============================================================================
-    # Step 2: Design RNA Library with Barcodes
-    # ==============================================================================
-    print("Step 2: Designing RNA probe library...", file=sys.stderr)
-
-    rna_library = {}
-    barcode_index = 0
-    used_barcodes = []
-
     # Check barcode requirements
-    unique_sequences = [seq_info[1] for seq_info in all_motifs.values() if seq_info[1]]
-    total_barcodes_needed = len(unique_sequences) * config['num_barcodes']
+    motifs_with_sequence = sum(1 for _, sequence in all_motifs.values() if sequence)
+    total_barcodes_needed = motifs_with_sequence * config['num_barcodes']
 
+    # Load just the barcodes the motifs consume; a shorter list means the
+    # file ran out first
     if total_barcodes_needed > len(barcodes):
-        raise ValueError(f"Not enough barcodes: need {total_barcodes_needed}, have {len(barcodes)}")
-
-    # Generate barcoded RNA library
-    for motif_name, (structure, sequence) in all_motifs.items():
-        if not sequence or not structure:
-            continue
-
-        for barcode_id in range(1, config['num_barcodes'] + 1):
-            if barcode_index >= len(barcodes):
-                break
-
-            probe_name = f"{motif_name}_Barcode_{barcode_id}"
-            barcode = barcodes[barcode_index]
+        barcodes = load_barcodes(barcodes_file, max_barcodes=total_barcodes_needed)
 
-            # Create barcoded RNA probe
-            conjugated_sequence = conjugate_stem(sequence, config['stem_length'])
-            probe_sequence = config['barcode_prefix'] + barcode + conjugated_sequence
+    if total_barcodes_needed > len(barcodes):
+        raise ValueError(f"Not enough barcodes: need {total_barcodes_needed}, have {len(barcodes)}")
 
-            rna_library[probe_name] = [structure, probe_sequence.upper().replace("T", "U")]
+    # ==============================================================================
+    # Output Setup
+    # ==============================================================================
+    output_files = {}
+    writer = None
+    pending_writes = []
 
-            barcode_index += 1
-            used_barcodes.append(barcode)
+    if output_dir:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"  ✅ Generated {len(rna_library)} RNA probes using {len(used_barcodes)} barcodes", file=sys.stderr)
+        output_files = {
+            "motifs": output_dir / "motifs.txt",
+            "rna_library": output_dir / "rna_library.txt",
+            "dna_templates": output_dir / "dna_templates.txt",
+            "array_barcodes": output_dir / "microarray_barcodes.txt"
+        }
 
-    # ==============================================================================
-    # Step 3: Design DNA Templates with T7 Promoter
-    # ==============================================================================
-    print("Step 3: Designing DNA templates...", file=sys.stderr)
+        # Each step's results are written on a background thread while the
+        # following steps are still being computed
+        writer = ThreadPoolExecutor(max_workers=2)
 
-    dna_templates = {}
+    try:
+        # ==========================================================================
+        # Step 2: Design RNA Library with Barcodes
+        # ==========================================================================
+        print("Step 2: Designing RNA probe library...", file=sys.stderr)
+
+        # Steps 2-4 are built in one pass, as parallel columns
+        probe_names = []
+        probe_structures = []
+        probe_sequences = []
+        template_sequences = []
+        capture_sequences = []
+        barcode_index = 0
+
+        if writer:
+            pending_writes.append(writer.submit(save_fasta_results, all_motifs, output_files["motifs"]))
+
+        # Generate barcoded RNA library
+        barcode_prefix = config['barcode_prefix']
+        stem_forward = STEM_FORWARD[:config['stem_length']]
+        stem_reverse = STEM_REVERSE[:config['stem_length']]
+
+        # Every probe is dna_to_rna(barcode_prefix + barcode + conjugated motif),
+        # and dna_to_rna maps each base on its own, so the parts are converted
+        # separately: the prefix once, and the barcodes the loop can consume in
+        # one batch
+        prefix_rna = dna_to_rna(barcode_prefix)
+        consumed_barcodes = barcodes[:total_barcodes_needed]
+        barcode_rnas = dna_to_rna_many(consumed_barcodes)
+
+        # The capture sequence is revcom(barcode_prefix + barcode), and since
+        # revcom(a + b) == revcom(b) + revcom(a) the DNA template
+        #   revcom(t7_promoter + probe) == revcom(conjugated motif) + capture + revcom(t7_promoter)
+        # so both are assembled from reverse complements computed once: the
+        # constant parts here, the barcodes in one batch, each motif per motif.
+        # revcom complements U like T, so no RNA->DNA pass is needed.
+        prefix_revcomp = revcom(barcode_prefix)
+        t7_promoter_revcomp = revcom(config['t7_promoter'])
+        barcode_captures = [f"{barcode_revcomp}{prefix_revcomp}"
+                            for barcode_revcomp in revcom_many(consumed_barcodes)]
+
+        for motif_name, (structure, sequence) in all_motifs.items():
+            if not sequence or not structure:
+                continue
+
+            # The stem-conjugated motif is shared by all of this motif's barcodes
+            conjugated_sequence = f"{stem_forward}{sequence}{stem_reverse}"
+            conjugated_rna = dna_to_rna(conjugated_sequence)
+            conjugated_revcomp = revcom(conjugated_sequence)
+
+            for barcode_id in range(1, config['num_barcodes'] + 1):
+                if barcode_index >= len(barcodes):
+                    break
+
+                probe_name = f"{motif_name}_Barcode_{barcode_id}"
+                capture_sequence = barcode_captures[barcode_index]
+
+                # Create barcoded RNA probe, its DNA template and its microarray
+                # capture sequence
+                probe_names.append(probe_name)
+                probe_structures.append(structure)
+                probe_sequences.append(f"{prefix_rna}{barcode_rnas[barcode_index]}{conjugated_rna}")
+                template_sequences.append(f"{conjugated_revcomp}{capture_sequence}{t7_promoter_revcomp}")
+                capture_sequences.append(capture_sequence)
+
+                barcode_index += 1
+
+        # Barcodes are consumed in file order, so the used ones are a prefix
+        used_barcodes = barcodes[:barcode_index]
+
+        rna_library = {
+            probe_name: [structure, rna_sequence]
+            for probe_name, structure, rna_sequence in zip(probe_names, probe_structures, probe_sequences)
+        }
 
-    for probe_name, (structure, rna_sequence) in rna_library.items():
-        template_name = f"{probe_name.replace('_Barcode_', '_Barcode_')}_template"
+        if writer:
+            pending_writes.append(writer.submit(save_fasta_results, rna_library, output_files["rna_library"]))
 
-        # Create DNA template: T7 promoter + reverse complement of RNA probe
-        dna_template_sequence = config['t7_promoter'] + rna_sequence
-        dna_template_revcomp = revcom(dna_template_sequence.upper().replace("U", "T"))
+        print(f"  ✅ Generated {len(rna_library)} RNA probes using {len(used_barcodes)} barcodes", file=sys.stderr)
 
-        dna_templates[template_name] = ["", dna_template_revcomp]
+        # ==========================================================================
+        # Step 3: Design DNA Templates with T7 Promoter
+        # ==========================================================================
+        print("Step 3: Designing DNA templates...", file=sys.stderr)
 
-    print(f"  ✅ Generated {len(dna_templates)} DNA templates", file=sys.stderr)
+        # Templates were assembled alongside their probes in Step 2
+        dna_templates = {
+            f"{probe_name}_template": ["", template_sequence]
+            for probe_name, template_sequence in zip(probe_names, template_sequences)
+        }
 
-    # ==============================================================================
-    # Step 4: Design Microarray Capture Barcodes
-    # ==============================================================================
-    print("Step 4: Designing microarray barcodes...", file=sys.stderr)
+        if writer:
+            pending_writes.append(writer.submit(save_fasta_results, dna_templates, output_files["dna_templates"]))
 
-    array_barcodes = {}
+        print(f"  ✅ Generated {len(dna_templates)} DNA templates", file=sys.stderr)
 
-    for i, barcode in enumerate(used_barcodes):
-        # Find corresponding probe name
-        probe_names = [name for name in rna_library.keys() if f"_Barcode_{(i % config['num_barcodes']) + 1}" in name]
-        if probe_names:
-            base_name = probe_names[0].replace(f"_Barcode_{(i % config['num_barcodes']) + 1}", "")
-            array_name = f"{base_name}_Barcode_{(i % config['num_barcodes']) + 1}_array"
+        # ==========================================================================
+        # Step 4: Design Microarray Capture Barcodes
+        # ==========================================================================
+        print("Step 4: Designing microarray barcodes...", file=sys.stderr)
 
-            # Create microarray capture sequence
-            capture_target = config['barcode_prefix'] + barcode
-            capture_sequence = revcom(capture_target)
+        # Capture sequences were assembled alongside their probes in Step 2
+        array_barcodes = {
+            f"{probe_name}_array": ["", capture_sequence]
+            for probe_name, capture_sequence in zip(probe_names, capture_sequences)
+        }
 
-            array_barcodes[array_name] = ["", capture_sequence]
+        if writer:
+            pending_writes.append(writer.submit(save_fasta_results, array_barcodes, output_files["array_barcodes"]))
 
-    print(f"  ✅ Generated {len(array_barcodes)} microarray barcodes", file=sys.stderr)
+        print(f"  ✅ Generated {len(array_barcodes)} microarray barcodes", file=sys.stderr)
+    finally:
+        if writer:
+            # Queued writes finish even if a step fails, and the writer
+            # thread never outlives the run
+            writer.shutdown(wait=True)
 
     # ==============================================================================
     # Save All Outputs
     # ==============================================================================
-    output_files = {}
-
-    if output_dir:
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save each step's results
-        output_files = {
-            "motifs": output_dir / "motifs.txt",
-            "rna_library": output_dir / "rna_library.txt",
-            "dna_templates": output_dir / "dna_templates.txt",
-            "array_barcodes": output_dir / "microarray_barcodes.txt"
-        }
-
-        save_fasta_results(all_motifs, output_files["motifs"])
-        save_fasta_results(rna_library, output_files["rna_library"])
-        save_fasta_results(dna_templates, output_files["dna_templates"])
-        save_fasta_results(array_barcodes, output_files["array_barcodes"])
+    if writer:
+        # Every write has finished; result() re-raises any write error
+        for future in pending_writes:
+            future.result()
 
         # Convert paths to strings for JSON serialization
         output_files = {k: str(v) for k, v in output_files.items()}
@@ -246,7 +307,7 @@ def run_comprehensive_workflow(
         "total_dna_templates": len(dna_templates),
         "total_array_barcodes": len(array_barcodes),
         "barcodes_used": len(used_barcodes),
-        "barcodes_available": len(barcodes),
+        "barcodes_loaded": len(barcodes),
         "config": config
     }
 
@@ -261,6 +322,71 @@ def run_comprehensive_workflow(
     }
 
 
+# ==============================================================================
+# Batch Processing
+# ==============================================================================
+def _run_workflow_file(input_file: str, barcodes_file: str, output_dir: Path,
+                       config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the workflow on one file of a batch into <output_dir>/<file stem>/; returns its metadata."""
+    result = run_comprehensive_workflow(input_file, barcodes_file, output_dir / Path(input_file).stem,
+                                        config=config)
+    return result['metadata']
+
+
+def run_batch_comprehensive_workflow(
+    input_files: Sequence[Union[str, Path]],
+    barcodes_file: Union[str, Path],
+    output_dir: Union[str, Path],
+    config: Optional[Dict[str, Any]] = None,
+    workers: int = 0,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Run the complete FOREST workflow on several FASTA files in parallel.
+
+    Files are independent, so each one is handled by its own worker process
+    and written to its own subdirectory of output_dir; every file draws on
+    the same barcode file. Only each file's metadata is sent back. A file
+    that fails is reported without stopping the rest.
+
+    Args:
+        input_files: Paths to FASTA files with RNA sequences and structures
+        barcodes_file: Path to file containing DNA barcodes
+        output_dir: Directory to save outputs (one subdirectory per file)
+        config: Configuration dict (uses DEFAULT_CONFIG if not provided)
+        workers: Number of files processed at once (0 uses all CPUs)
+        **kwargs: Override specific config parameters
+
+    Returns:
+        Dict containing:
+            - results: Metadata of each successfully processed file
+            - errors: Error message of each failed file
+            - output_dir: Path to output directory
+    """
+    output_dir = Path(output_dir)
+    config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
+    input_files = [str(input_file) for input_file in input_files]
+
+    results = {}
+    errors = {}
+    worker = partial(_run_workflow_file, barcodes_file=str(barcodes_file), output_dir=output_dir,
+                     config=config)
+    for input_file, metadata, error in iter_file_results(worker, input_files, jobs=workers):
+        if error is not None:
+            errors[input_file] = error
+            print(f"❌ {input_file}: {error}", file=sys.stderr)
+        else:
+            results[input_file] = metadata
+            print(f"✅ {input_file}: {metadata['total_rna_probes']} RNA probes from "
+                  f"{metadata['total_motifs']} motifs", file=sys.stderr)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "output_dir": str(output_dir)
+    }
+
+
 # ==============================================================================
 # CLI Interface
 # ==============================================================================
@@ -269,8 +395,11 @@ def main():
         description=__doc__,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument('--input', '-i', required=True,
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--input', '-i',
                         help='Input FASTA file with RNA sequences and structures')
+    inputs.add_argument('--inputs',
+                        help='Comma-separated input FASTA files, processed in parallel')
     parser.add_argument('--barcodes', '-b', required=True,
                         help='Barcode file containing DNA barcodes')
     parser.add_argument('--output_dir', '-o', required=True,
@@ -281,6 +410,8 @@ def main():
                         help='Number of barcodes per RNA structure (default: 2)')
     parser.add_argument('--max_length', '-L', type=int, default=134,
                         help='Maximum motif length (default: 134)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for motif extraction (0 = all CPUs, default: 1)')
 
     args = parser.parse_args()
 
@@ -296,6 +427,23 @@ def main():
         cli_overrides['num_barcodes'] = args.num_barcodes
     if args.max_length != 134:
         cli_overrides['max_length'] = args.max_length
+    if args.jobs != 1:
+        cli_overrides['jobs'] = args.jobs
+
+    if args.inputs:
+        result = run_batch_comprehensive_workflow(
+            input_files=args.inputs.split(","),
+            barcodes_file=args.barcodes,
+            output_dir=args.output_dir,
+            config=config,
+            **cli_overrides
+        )
+        print(f"✅ Processed {len(result['results'])} files, results saved to: {result['output_dir']}",
+              file=sys.stderr)
+        if result['errors']:
+            print(f"❌ {len(result['errors'])} files failed", file=sys.stderr)
+            sys.exit(1)
+        return result
 
     try:
         # Run comprehensive workflow
@@ -317,7 +465,7 @@ def main():
         print(f"✅ Generated {metadata['total_rna_probes']} RNA probes", file=sys.stderr)
         print(f"✅ Generated {metadata['total_dna_templates']} DNA templates", file=sys.stderr)
         print(f"✅ Generated {metadata['total_array_barcodes']} microarray barcodes", file=sys.stderr)
-        print(f"✅ Used {metadata['barcodes_used']}/{metadata['barcodes_available']} barcodes", file=sys.stderr)
+        print(f"✅ Used {metadata['barcodes_used']} barcodes", file=sys.stderr)
 
         if result['output_files']:
             print(f"\nOutput files:", file=sys.stderr)
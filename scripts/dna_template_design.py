@@ -18,18 +18,20 @@ Example:
 # ==============================================================================
 import argparse
 from pathlib import Path
-from typing import Union, Optional, Dict, Any, List
+from typing import Union, Optional, Dict, Any, Iterator, List, Tuple
 import json
 import sys
 
 # Add scripts/lib to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from lib.forest_core import (
-    terminal_motif_extraction,
+    extract_all_motifs,
     parse_fasta_with_structure,
     load_barcodes,
-    conjugate_stem,
+    STEM_FORWARD,
+    STEM_REVERSE,
     revcom,
+    revcom_many,
     save_fasta_results
 )
 
@@ -38,6 +40,7 @@ from lib.forest_core import (
 # ==============================================================================
 DEFAULT_CONFIG = {
     "max_length": 134,
+    "jobs": 1,
     "num_barcodes": 3,
     "barcode_prefix": "GGG",
     "stem_length": 17,
@@ -46,6 +49,38 @@ DEFAULT_CONFIG = {
     "include_metadata": True
 }
 
+# ==============================================================================
+# Template Builders
+# ==============================================================================
+def _iter_templates(
+    motifs: List[Tuple[str, str]],
+    barcode_revcomps: List[str],
+    num_barcodes: int,
+    prefixed_promoter_revcomp: str
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yield the (template name, ["", template sequence]) records of a run of barcoded motifs.
+
+    Args:
+        motifs: (motif name, stem-conjugated motif reverse complement) pairs
+        barcode_revcomps: Barcode reverse complements, num_barcodes per motif
+        num_barcodes: Number of barcodes per motif
+        prefixed_promoter_revcomp: Reverse complement of T7 promoter + barcode prefix
+    """
+    barcode_ids = range(1, num_barcodes + 1)
+
+    for motif_index, (motif_name, conjugated_revcomp) in enumerate(motifs):
+        base = motif_index * num_barcodes
+        motif_barcode_revcomps = barcode_revcomps[base:base + num_barcodes]
+
+        # Create DNA template: reverse complement of T7 promoter + RNA probe
+        # (prefix + barcode + conjugated stem + sequence). DNA templates
+        # carry no structure.
+        for barcode_id, barcode_revcomp in zip(barcode_ids, motif_barcode_revcomps):
+            yield (f"{motif_name}_Barcode_{barcode_id}_template",
+                   ["", f"{conjugated_revcomp}{barcode_revcomp}{prefixed_promoter_revcomp}"])
+
+
 # ==============================================================================
 # Core Function
 # ==============================================================================
@@ -54,6 +89,7 @@ def run_dna_template_design(
     barcodes_file: Union[str, Path],
     output_file: Optional[Union[str, Path]] = None,
     config: Optional[Dict[str, Any]] = None,
+    return_templates: bool = True,
     **kwargs
 ) -> Dict[str, Any]:
     """
@@ -64,11 +100,14 @@ def run_dna_template_design(
         barcodes_file: Path to file containing DNA barcodes
         output_file: Path to save DNA templates (optional)
         config: Configuration dict (uses DEFAULT_CONFIG if not provided)
+        return_templates: Keep the templates in the result. With False and an
+            output_file, templates are streamed to the file and never held in
+            memory
         **kwargs: Override specific config parameters
 
     Returns:
         Dict containing:
-            - templates: DNA template data
+            - templates: DNA template data (None if return_templates is False)
             - output_file: Path to output file (if saved)
             - metadata: Execution metadata
 
@@ -81,6 +120,9 @@ def run_dna_template_design(
     barcodes_file = Path(barcodes_file)
     config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
 
+    if config['num_barcodes'] < 0:
+        raise ValueError(f"num_barcodes must be non-negative, got {config['num_barcodes']}")
+
     # Validate input files
     if not input_file.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
@@ -93,8 +135,10 @@ def run_dna_template_design(
     except Exception as e:
         raise ValueError(f"Failed to parse input file: {e}")
 
+    # Only the first barcode is read for now; the rest are loaded once the
+    # number the motifs consume is known
     try:
-        barcodes = load_barcodes(barcodes_file)
+        barcodes = load_barcodes(barcodes_file, max_barcodes=1)
     except Exception as e:
         raise ValueError(f"Failed to parse barcodes file: {e}")
 
@@ -104,71 +148,77 @@ def run_dna_template_design(
         raise ValueError("No valid barcodes found in barcodes file")
 
     # Extract motifs from all sequences
-    all_motifs = {}
-    processed_sequences = 0
-
-    for name, sequence, structure in parsed_data:
-        try:
-            motifs = terminal_motif_extraction(
-                name=name.lstrip('>'),  # Remove '>' prefix
-                seq=structure,
-                seq2=sequence,
-                max_length=config['max_length']
-            )
-            all_motifs.update(motifs)
-            processed_sequences += 1
-        except Exception as e:
-            print(f"Warning: Failed to process sequence {name}: {e}", file=sys.stderr)
-            continue
-
-    # Generate DNA templates
-    dna_templates = {}
-    barcode_index = 0
-    used_barcodes = []
+    all_motifs, processed_sequences = extract_all_motifs(
+        parsed_data,
+        max_length=config['max_length'],
+        jobs=config['jobs']
+    )
 
     # Get unique sequences for barcode calculation
-    unique_sequences = [seq_info[1] for seq_info in all_motifs.values() if seq_info[1]]
-    total_barcodes_needed = len(unique_sequences) * config['num_barcodes']
+    motifs_with_sequence = sum(1 for _, sequence in all_motifs.values() if sequence)
+    total_barcodes_needed = motifs_with_sequence * config['num_barcodes']
+
+    # Load just the barcodes the motifs consume; a shorter list means the
+    # file ran out first
+    if total_barcodes_needed > len(barcodes):
+        barcodes = load_barcodes(barcodes_file, max_barcodes=total_barcodes_needed)
 
     if total_barcodes_needed > len(barcodes):
         raise ValueError(f"Not enough barcodes: need {total_barcodes_needed}, have {len(barcodes)}")
 
     print(f"# Loading {len(barcodes)} barcodes", file=sys.stderr)
     print(f"# Number of barcodes per RNA structure: {config['num_barcodes']}", file=sys.stderr)
-    print(f"# Number of RNA structures: {len(unique_sequences)}", file=sys.stderr)
-
-    # Generate DNA template pool
+    print(f"# Number of RNA structures: {motifs_with_sequence}", file=sys.stderr)
+
+    # Generate DNA template pool from the reverse complements of its parts;
+    # the constant parts are reverse-complemented once here
+    stem_forward_revcomp = revcom(STEM_FORWARD[:config['stem_length']])
+    stem_reverse_revcomp = revcom(STEM_REVERSE[:config['stem_length']])
+    prefixed_promoter_revcomp = revcom(f"{config['t7_promoter']}{config['barcode_prefix']}")
+
+    # Barcode reverse complements for every barcode the loop can consume,
+    # computed in one batch
+    barcode_revcomps = revcom_many(barcodes[:total_barcodes_needed])
+
+    # Barcoded motifs (those with both a sequence and a structure) as
+    # parallel columns, so their sequences are reverse-complemented in one batch
+    motif_names = []
+    motif_sequences = []
     for motif_name, (structure, sequence) in all_motifs.items():
-        if not sequence or not structure:
-            continue
-
-        for barcode_id in range(1, config['num_barcodes'] + 1):
-            if barcode_index >= len(barcodes):
-                break
-
-            template_name = f"{motif_name}_Barcode_{barcode_id}_template"
-            barcode = barcodes[barcode_index]
-
-            # Create RNA probe sequence: prefix + barcode + conjugated stem + sequence
-            conjugated_sequence = conjugate_stem(sequence, config['stem_length'])
-            rna_probe = config['barcode_prefix'] + barcode + conjugated_sequence
+        if sequence and structure:
+            motif_names.append(motif_name)
+            motif_sequences.append(sequence)
+
+    # Each distinct motif sequence is reverse-complemented and conjugated once
+    unique_sequences = list(dict.fromkeys(motif_sequences))
+    conjugated_revcomps = {
+        sequence: f"{stem_reverse_revcomp}{sequence_revcomp}{stem_forward_revcomp}"
+        for sequence, sequence_revcomp in zip(unique_sequences, revcom_many(unique_sequences))
+    }
 
-            # Create DNA template: T7 promoter + reverse complement of RNA probe
-            dna_template_sequence = config['t7_promoter'] + rna_probe
-            dna_template_revcomp = revcom(dna_template_sequence.upper().replace("U", "T"))
+    # Every barcoded motif takes the next num_barcodes barcodes, so the
+    # barcodes of motif i are the slice starting at i * num_barcodes. The
+    # check above guarantees there are enough of them.
+    num_barcodes = config['num_barcodes']
+    motifs = [(motif_name, conjugated_revcomps[sequence])
+              for motif_name, sequence in zip(motif_names, motif_sequences)]
 
-            # Store the DNA template (reverse complement for oligo pool ordering)
-            dna_templates[template_name] = ["", dna_template_revcomp]  # No structure for DNA
+    # Every motif gets a full barcode slice
+    total_templates = len(motifs) * num_barcodes
+    used_barcodes = barcodes[:total_templates]
+    templates = _iter_templates(motifs, barcode_revcomps, num_barcodes, prefixed_promoter_revcomp)
 
-            barcode_index += 1
-            used_barcodes.append(barcode)
+    # Store the DNA templates (reverse complement for oligo pool ordering),
+    # unless they are only wanted on disk, in which case they are streamed
+    # to the file as they are built and never held in memory
+    dna_templates = dict(templates) if return_templates else None
 
     # Save output if requested
     output_path = None
     if output_file:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        save_fasta_results(dna_templates, output_path)
+        save_fasta_results(dna_templates if return_templates else templates, output_path)
 
     # Prepare metadata
     metadata = {
@@ -176,9 +226,9 @@ def run_dna_template_design(
         "barcodes_file": str(barcodes_file),
         "processed_sequences": processed_sequences,
         "total_motifs": len(all_motifs),
-        "total_templates": len(dna_templates),
+        "total_templates": total_templates,
         "barcodes_used": len(used_barcodes),
-        "barcodes_available": len(barcodes),
+        "barcodes_loaded": len(barcodes),
         "config": config
     }
 
@@ -210,6 +260,8 @@ def main():
                         help='Number of barcodes per RNA structure (default: 3)')
     parser.add_argument('--max_length', '-L', type=int, default=134,
                         help='Maximum motif length (default: 134)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for motif extraction (0 = all CPUs, default: 1)')
 
     args = parser.parse_args()
 
@@ -225,6 +277,8 @@ def main():
         cli_overrides['num_barcodes'] = args.num_barcodes
     if args.max_length != 134:
         cli_overrides['max_length'] = args.max_length
+    if args.jobs != 1:
+        cli_overrides['jobs'] = args.jobs
 
     try:
         # Run DNA template design
@@ -233,6 +287,8 @@ def main():
             barcodes_file=args.barcodes,
             output_file=args.output,
             config=config,
+            # Only printed when there is no output file to stream to
+            return_templates=not args.output,
             **cli_overrides
         )
 
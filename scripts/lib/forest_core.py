@@ -7,9 +7,13 @@ and create self-contained functionality for MCP tool wrapping.
 Original author: Kaoru R. Komatsu
 """
 
+import mmap
+import os
 import re
-from collections import Counter
-from typing import Dict, List, Tuple, Optional, Any
+import sys
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, List, Tuple, Optional, Any, Iterable, Iterator, Sequence, Union
 from pathlib import Path
 
 
@@ -20,6 +24,10 @@ from pathlib import Path
 # Regex pattern for loop structures: one or more '(' followed by one or more '.' followed by one or more ')'
 LOOP_PATTERN = re.compile(r'\(+\.+\)+')
 
+# Stabilizing stems added on either side of a motif by conjugate_stem
+STEM_FORWARD = "GTGTACGAAGTTTCAGC"
+STEM_REVERSE = "GCTGAAGCTTCGTGCAC"
+
 
 # ==============================================================================
 # Utility Functions (inlined from FOREST.py)
@@ -29,63 +37,163 @@ def bracket_divider(seq: str) -> List[str]:
     """
     Divide sequence at the boundary between ')' or '.' and other characters.
 
+    The split point is the length of the leading run of "." and ")".
+
     Original: FOREST.py lines 27-33
     """
-    i = 0
-    while i < len(seq) and (seq[i] == "." or seq[i] == ")"):
-        i += 1
+    i = len(seq) - len(seq.lstrip(".)"))
     return [seq[0:i], seq[i:]]
 
 
-def revcom(seq: str) -> str:
+def _build_translation_table(source: bytes, target: bytes) -> bytes:
+    """Build a 256-entry table that upper-cases ASCII, then maps source to target bytes."""
+    table = bytearray(bytes.maketrans(b"", b"").upper())
+    for base, replacement in zip(source, target):
+        table[base] = replacement
+    return bytes(table)
+
+
+_REVCOM_TABLE = _build_translation_table(b"ACGTUacgtu", b"TGCAATGCAA")
+_REVCOM_STR_TABLE = str.maketrans("ACGTU", "TGCAA")
+# The same mapping over every ASCII code point, so ASCII str can be
+# translated directly without an encode/decode round trip
+_REVCOM_ASCII_TABLE = str.maketrans({code: chr(_REVCOM_TABLE[code]) for code in range(128)})
+_T2U_TABLE = _build_translation_table(b"Tt", b"UU")
+_T2U_ASCII_TABLE = str.maketrans({code: chr(_T2U_TABLE[code]) for code in range(128)})
+
+
+def revcom(seq: Union[str, bytes]) -> Union[str, bytes]:
     """
     Generate reverse complement of a nucleotide sequence.
 
+    Complementing and upper-casing happen in one bytes.translate pass over a
+    256-entry lookup table. U is complemented to A, like T, so RNA needs no
+    U->T pass first. A bytes sequence is translated as is and returned as
+    bytes. An ASCII str is translated as str over the same table: CPython's
+    ASCII fast path for str.translate beats an encode/translate/decode
+    round trip.
+
     Original: FOREST.py lines 35-42
     """
-    seq = seq.upper()
-    seq = seq.replace("A", "t")
-    seq = seq.replace("U", "a")
-    seq = seq.replace("T", "a")
-    seq = seq.replace("G", "c")
-    seq = seq.replace("C", "g")
-    return seq[::-1].upper()
+    if isinstance(seq, bytes):
+        return seq.translate(_REVCOM_TABLE)[::-1]
+    if seq.isascii():
+        return seq.translate(_REVCOM_ASCII_TABLE)[::-1]
+    return seq.upper().translate(_REVCOM_STR_TABLE)[::-1].upper()
+
+
+def revcom_many(seqs: List[str]) -> List[str]:
+    """
+    Reverse-complement a batch of sequences with one translate pass.
+
+    The sequences are joined with newlines and translated and reversed as a
+    single buffer, then split apart again. Reversing the buffer also reverses
+    the record order, so the split list is flipped back. Returns the same
+    list as [revcom(seq) for seq in seqs].
+    """
+    joined = "\n".join(seqs)
+    if not joined.isascii():
+        return [revcom(seq) for seq in seqs]
+
+    revcomps = joined.translate(_REVCOM_ASCII_TABLE)[::-1].split("\n")
+    if len(revcomps) != len(seqs):
+        # Empty batch, or a sequence that itself contains a newline
+        return [revcom(seq) for seq in seqs]
+
+    revcomps.reverse()
+    return revcomps
+
+
+def dna_to_rna(seq: str) -> str:
+    """
+    Upper-case a nucleotide sequence and convert T to U in a single pass.
+
+    Equivalent to seq.upper().replace("T", "U").
+    """
+    if seq.isascii():
+        return seq.translate(_T2U_ASCII_TABLE)
+    return seq.upper().replace("T", "U")
+
+
+def dna_to_rna_many(seqs: List[str]) -> List[str]:
+    """
+    Convert a batch of sequences to RNA with one translate pass.
+
+    The conversion maps each character on its own, so the sequences are
+    joined with newlines, converted as a single buffer and split apart
+    again. Returns the same list as [dna_to_rna(seq) for seq in seqs].
+    """
+    rnas = dna_to_rna("\n".join(seqs)).split("\n")
+    if len(rnas) != len(seqs):
+        # Empty batch, or a sequence that itself contains a newline
+        return [dna_to_rna(seq) for seq in seqs]
+    return rnas
 
 
 def hitpoint_brew(hitpoint: int, seq: str) -> str:
     """
     Extract sequence up to a specific bracket count.
 
+    Returns the shortest prefix holding hitpoint brackets of either kind, or
+    the whole sequence if it holds fewer (or hitpoint is negative).
+
     Original: FOREST.py lines 44-50
     """
-    i = 0
-    while hitpoint != 0 and i < len(seq):
-        if seq[i] == ")" or seq[i] == "(":
-            hitpoint -= 1
-        i += 1
-    return seq[0:i]
+    if hitpoint == 0:
+        return ""
+    if hitpoint < 0:
+        return seq
+    index = _nth_find(seq.replace(")", "("), "(", hitpoint)
+    return seq if index < 0 else seq[:index + 1]
+
+
+def _nth_find(seq: str, char: str, n: int) -> int:
+    """Index of the n-th (n >= 1) occurrence of char in seq, or -1 if there are fewer."""
+    index = -1
+    for _ in range(n):
+        index = seq.find(char, index + 1)
+        if index < 0:
+            break
+    return index
+
+
+def _nth_rfind(seq: str, char: str, n: int) -> int:
+    """Index of the n-th (n >= 1) occurrence of char counting from the end of seq, or -1."""
+    index = len(seq)
+    for _ in range(n):
+        index = seq.rfind(char, 0, index)
+        if index < 0:
+            break
+    return index
 
 
 def hitpoint_counter(hitpoint: int, seq: str, bracket: str) -> str:
     """
     Count brackets and extract sequence partition.
 
+    For ")" this is the shortest prefix of seq holding hitpoint ")" brackets,
+    and for "(" the shortest suffix holding hitpoint "(" brackets. The
+    partition never covers the whole of seq: when no shorter one holds
+    enough brackets, seq minus its last (")") or first ("(") character is
+    returned.
+
     Original: FOREST.py lines 52-65
     """
-    partition = ""
-    i = 0
+    if bracket != ")" and bracket != "(":
+        return ""
+    if hitpoint == 0 or not seq:
+        return ""
+
     if bracket == ")":
-        while hitpoint != partition.count(bracket) and i < len(seq):
-            partition = seq[0:i]
-            i += 1
-        return partition
-    elif bracket == "(":
-        seq_rev = seq[::-1]
-        while hitpoint != partition.count(bracket) and i < len(seq_rev):
-            partition = seq_rev[0:i]
-            i += 1
-        return partition[::-1]
-    return ""
+        index = _nth_find(seq, ")", hitpoint) if hitpoint > 0 else -1
+        if 0 <= index < len(seq) - 1:
+            return seq[:index + 1]
+        return seq[:-1]
+
+    index = _nth_rfind(seq, "(", hitpoint) if hitpoint > 0 else -1
+    if index >= 1:
+        return seq[index:]
+    return seq[1:]
 
 
 def loop_brew(seq: str) -> List[str]:
@@ -94,18 +202,18 @@ def loop_brew(seq: str) -> List[str]:
 
     This is the core loop extraction algorithm from FOREST.
     Original: FOREST.py lines 67-121
+
+    Each loop match is paired with the text between it and its neighbouring
+    matches (or the string ends). These are read off a single finditer pass
+    rather than separate findall and split scans.
     """
     output = []
-    main = LOOP_PATTERN.findall(seq)
-    part = LOOP_PATTERN.split(seq)
-
-    for m in range(len(main)):
-        n = m + 1
-        if n >= len(part):
-            break
+    matches = list(LOOP_PATTERN.finditer(seq))
 
-        left = part[m]
-        right = part[n]
+    for m, match in enumerate(matches):
+        loop = match.group()
+        left = seq[matches[m - 1].end() if m else 0:match.start()]
+        right = seq[match.end():matches[m + 1].start() if m + 1 < len(matches) else len(seq)]
 
         if left == "":
             left = "."
@@ -114,19 +222,17 @@ def loop_brew(seq: str) -> List[str]:
 
         part_left = bracket_divider(left)[1]
         part_right = bracket_divider(right)[0]
-        whole = ''.join([part_left, main[m], part_right])
+        whole = ''.join([part_left, loop, part_right])
         hitpoint_right_g = hitpoint_left_g = min(whole.count("("), whole.count(")"))
 
-        main_c = Counter(main[m])
-
-        hitpoint_left = hitpoint_left_g - int(main_c.get("(", 0))
-        hitpoint_right = hitpoint_right_g - int(main_c.get(")", 0))
+        hitpoint_left = hitpoint_left_g - loop.count("(")
+        hitpoint_right = hitpoint_right_g - loop.count(")")
 
         if hitpoint_right == 0 and hitpoint_left == 0:
-            output.append(main[m].strip('.'))
+            output.append(loop.strip('.'))
 
         elif hitpoint_right < 0 or hitpoint_left < 0:
-            refseq = main[m]
+            refseq = loop
 
             if hitpoint_right < 0:
                 refseq = hitpoint_counter(hitpoint_right_g, refseq, ")")
@@ -147,7 +253,7 @@ def loop_brew(seq: str) -> List[str]:
         else:
             final_right = hitpoint_counter(hitpoint_right, part_right, ")")
             final_left = hitpoint_counter(hitpoint_left, part_left, "(")
-            output.append(''.join([final_left, main[m], final_right]))
+            output.append(''.join([final_left, loop, final_right]))
 
     return output
 
@@ -168,34 +274,31 @@ def packman(seq: str) -> str:
     """
     Pack/compress secondary structure by removing outer brackets.
 
+    The wider of the leading and trailing dot-free runs gives the number of
+    brackets to peel. Everything up to and including that many "(" from the
+    left, and up to and including that many ")" from the right, is cut and
+    the remaining dots stripped. If either bracket count is not reached
+    before the end of seq, only the dots are stripped.
+
     Original: FOREST.py lines 129-143
     """
     if not seq or "." not in seq:
         return seq
 
-    # Find first and last dot positions
-    try:
-        i = 0
-        t = 0
-        while i < len(seq) and seq[i] != ".":
-            i += 1
-        while t < len(seq) and seq[len(seq)-1-t] != ".":
-            t += 1
-        pack_num = max(i, t)
-
-        i = 0
-        t = 0
-        while i < len(seq) and seq[:i].count("(") != pack_num:
-            i += 1
-        while t < len(seq) and seq[len(seq)-1-t:len(seq)].count(")") != pack_num:
-            t += 1
-
-        if i < len(seq) and t < len(seq):
-            return seq[i:len(seq)-1-t].strip('.')
-        else:
-            return seq.strip('.')
-    except:
-        return seq.strip('.')
+    # Lengths of the dot-free runs at either end
+    first_dot = seq.find(".")
+    trailing = len(seq) - 1 - seq.rfind(".")
+    pack_num = max(first_dot, trailing)
+
+    if pack_num == 0:
+        # seq starts and ends with a dot
+        return seq[:-1].strip('.')
+
+    i = _nth_find(seq, "(", pack_num) + 1
+    right = _nth_rfind(seq, ")", pack_num)
+    if 0 < i < len(seq) and right >= 0:
+        return seq[i:right].strip('.')
+    return seq.strip('.')
 
 
 def loop_list_judge(secondary_loop_list: List[str]) -> str:
@@ -261,10 +364,13 @@ def conjugate_stem(seq: str, n: int = 17) -> str:
     """
     Add stabilizing stem sequences around the RNA motif.
 
+    Callers conjugating many motifs can slice STEM_FORWARD/STEM_REVERSE to
+    n once themselves and skip the per-call slicing.
+
     Original: FOREST.py lines 180-184
     """
-    forward = "GTGTACGAAGTTTCAGC"[0:n]
-    reverse = "GCTGAAGCTTCGTGCAC"[:n]
+    forward = STEM_FORWARD[0:n]
+    reverse = STEM_REVERSE[:n]
     output = forward + seq + reverse
     return output
 
@@ -273,7 +379,26 @@ def conjugate_stem(seq: str, n: int = 17) -> str:
 # Core FOREST Algorithm
 # ==============================================================================
 
-def terminal_motif_extraction(name: str, seq: str, seq2: str, max_length: int = 100) -> Dict[str, List[str]]:
+def _multi_terminal_motifs(name: str, seq: str, seq2: str, secondary_seq: str,
+                           secondary_loop_list: List[str], library_length_limit: int,
+                           replace_times: int) -> Dict[str, Tuple[str, str]]:
+    """
+    Collect the multi-terminal motifs found at one level of loop replacement.
+
+    Originally nested inside terminal_motif_extraction.
+    """
+    output = {}
+    if loop_list_judge(secondary_loop_list) == "Read":
+        for k, loop_rep in enumerate(secondary_loop_list):
+            identical_name_multi = '_'.join([name, "Multi", str(k+1), "ComplexLevel", str(1+replace_times)])
+            lr_locus = threshold(secondary_seq, loop_rep, library_length_limit)
+            outseqandstrc = (seq[lr_locus[0]:lr_locus[1]], seq2[lr_locus[0]:lr_locus[1]])
+            if len(outseqandstrc[1]) <= library_length_limit:
+                output[identical_name_multi] = outseqandstrc
+    return output
+
+
+def terminal_motif_extraction(name: str, seq: str, seq2: str, max_length: int = 100) -> Dict[str, Tuple[str, str]]:
     """
     Main terminal motif extraction algorithm.
 
@@ -287,7 +412,7 @@ def terminal_motif_extraction(name: str, seq: str, seq2: str, max_length: int =
         max_length: Maximum motif length
 
     Returns:
-        Dict mapping motif names to [structure, sequence] pairs
+        Dict mapping motif names to (structure, sequence) tuples
     """
     output = {}
 
@@ -297,40 +422,32 @@ def terminal_motif_extraction(name: str, seq: str, seq2: str, max_length: int =
 
     strct = seq
     motifcount = 1
-    for t in range(len(result1)):
+    for loop_structure, _ in result1:
         identical_name = '_'.join([name, "Motif", str(motifcount)])
 
-        lr_locus = threshold(strct, result1[t][0], limit=max_length)
-        outseqandstrc = [strct[lr_locus[0]:lr_locus[1]], seq2[lr_locus[0]:lr_locus[1]]]
+        lr_locus = threshold(strct, loop_structure, limit=max_length)
+        outseqandstrc = (strct[lr_locus[0]:lr_locus[1]], seq2[lr_locus[0]:lr_locus[1]])
 
         if len(outseqandstrc[1]) <= max_length:
             output[identical_name] = outseqandstrc
             motifcount += 1
-        rep = '!' * len(result1[t][0])
-        strct = strct.replace(str(result1[t][0]), rep, 1)
+        strct = strct.replace(loop_structure, '!' * len(loop_structure), 1)
 
     # Multiple terminal motif extraction
-    def multi_terminal_motif_extraction(name: str, secondary_seq: str,
-                                       secondary_loop_list: List[str],
-                                       library_length_limit: int,
-                                       replace_times: int) -> Dict[str, List[str]]:
-        output2 = {}
-        if loop_list_judge(secondary_loop_list) == "Read":
-            for k, i in enumerate(secondary_loop_list):
-                loop_rep = i
-                identical_name_multi = '_'.join([name, "Multi", str(k+1), "ComplexLevel", str(1+replace_times)])
-                lr_locus = threshold(secondary_seq, loop_rep, library_length_limit)
-                outseqandstrc = [seq[lr_locus[0]:lr_locus[1]], seq2[lr_locus[0]:lr_locus[1]]]
-                if len(outseqandstrc[1]) <= library_length_limit:
-                    output2[identical_name_multi] = outseqandstrc
-        return output2
-
     secondary_seq = dot_replace(seq, loop_list)
     replace_times = 0
 
     while "(" in secondary_seq:
         secondary_loop_list = loop_brew(secondary_seq)
-        output.update(multi_terminal_motif_extraction(name, secondary_seq, secondary_loop_list, max_length, replace_times))
+
+        # No loops left means dot_replace would return secondary_seq as is,
+        # so every further pass up to the safety break would repeat this one
+        # and add nothing
+        if not secondary_loop_list:
+            break
+
+        output.update(_multi_terminal_motifs(name, seq, seq2, secondary_seq, secondary_loop_list,
+                                             max_length, replace_times))
         secondary_seq = dot_replace(secondary_seq, secondary_loop_list)
         replace_times += 1
 
@@ -341,10 +458,215 @@ def terminal_motif_extraction(name: str, seq: str, seq2: str, max_length: int =
     return output
 
 
+def _extract_record_motifs(record: Tuple[str, str, str], max_length: int) -> Tuple[Optional[Dict[str, Tuple[str, str]]], Optional[str]]:
+    """
+    Run terminal_motif_extraction on one parsed (name, sequence, structure) record.
+
+    Module-level so it can be pickled into worker processes. Failures are
+    returned as an error message instead of raised, so one bad record does
+    not abort a whole batch.
+    """
+    name, sequence, structure = record
+    try:
+        motifs = terminal_motif_extraction(
+            name=name.lstrip('>'),  # Remove '>' prefix
+            seq=structure,
+            seq2=sequence,
+            max_length=max_length
+        )
+        return motifs, None
+    except Exception as e:
+        return None, str(e)
+
+
+def _rename_motifs(motifs: Dict[str, Tuple[str, str]], old_name: str, new_name: str) -> Dict[str, Tuple[str, str]]:
+    """Swap the sequence-name prefix of every motif key from old_name to new_name."""
+    prefix_length = len(old_name)
+    return {new_name + motif_name[prefix_length:]: motif
+            for motif_name, motif in motifs.items()}
+
+
+# Fewest distinct records worth spreading over a process pool; below this,
+# starting the workers costs more than extracting the records in-process
+_MIN_POOL_RECORDS = 100
+
+
+def iter_record_motifs(parsed_data: Iterable[Tuple[str, str, str]], max_length: int = 100,
+                       jobs: int = 1) -> Iterator[Dict[str, Tuple[str, str]]]:
+    """
+    Yield the motifs of each successfully processed FASTA record, in input order.
+
+    Records are independent, so with jobs > 1 they are spread over a process
+    pool, unless there are fewer than _MIN_POOL_RECORDS distinct ones to
+    extract. Records sharing the same sequence and structure are only extracted
+    once; their motifs differ just in the name prefix of each key. Records
+    that fail are reported on stderr and skipped.
+
+    A serial run makes a single pass over parsed_data, so it may be a lazy
+    iterator such as iter_fasta_with_structure and records are extracted as
+    they are read.
+
+    Args:
+        parsed_data: (name, sequence, structure) tuples from parse_fasta_with_structure
+            or iter_fasta_with_structure
+        max_length: Maximum motif length
+        jobs: Number of worker processes (0 uses all CPUs, 1 runs in-process)
+
+    Yields:
+        Dict mapping the record's motif names to (structure, sequence) tuples
+    """
+    worker = partial(_extract_record_motifs, max_length=max_length)
+    workers = jobs or os.cpu_count() or 1
+
+    # First record name and extraction result for each distinct
+    # (sequence, structure) pair
+    extracted = {}
+
+    if workers > 1:
+        # Imported here: concurrent.futures.process is the costliest import of
+        # this module, and serial runs (every job's default) never need it
+        from concurrent.futures import ProcessPoolExecutor
+
+        parsed_data = list(parsed_data)
+        first_names = {}
+        for name, sequence, structure in parsed_data:
+            first_names.setdefault((sequence, structure), name)
+
+        if len(first_names) >= _MIN_POOL_RECORDS:
+            unique_data = [(name, sequence, structure)
+                           for (sequence, structure), name in first_names.items()]
+            chunksize = max(1, len(unique_data) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(worker, unique_data, chunksize=chunksize)
+                extracted = {key: (name, result)
+                             for (key, name), result in zip(first_names.items(), results)}
+
+    # Yield in input order, so repeated motif names resolve as in a serial run
+    for name, sequence, structure in parsed_data:
+        key = (sequence, structure)
+        entry = extracted.get(key)
+        if entry is None:
+            entry = extracted[key] = (name, worker((name, sequence, structure)))
+        first_name, (motifs, error) = entry
+
+        if error is not None:
+            print(f"Warning: Failed to process sequence {name}: {error}", file=sys.stderr)
+            continue
+        if name != first_name:
+            motifs = _rename_motifs(motifs, first_name.lstrip('>'), name.lstrip('>'))
+        yield motifs
+
+
+def extract_all_motifs(parsed_data: Iterable[Tuple[str, str, str]], max_length: int = 100,
+                       jobs: int = 1) -> Tuple[Dict[str, Tuple[str, str]], int]:
+    """
+    Extract terminal motifs from every parsed FASTA record.
+
+    Merges the per-record motifs of iter_record_motifs in input order,
+    giving the same output for any number of jobs.
+
+    Args:
+        parsed_data: (name, sequence, structure) tuples from parse_fasta_with_structure
+            or iter_fasta_with_structure
+        max_length: Maximum motif length
+        jobs: Number of worker processes (0 uses all CPUs, 1 runs in-process)
+
+    Returns:
+        Tuple of (dict mapping motif names to (structure, sequence) tuples,
+        number of successfully processed sequences)
+    """
+    all_motifs = {}
+    processed_sequences = 0
+
+    for motifs in iter_record_motifs(parsed_data, max_length=max_length, jobs=jobs):
+        all_motifs.update(motifs)
+        processed_sequences += 1
+
+    return all_motifs, processed_sequences
+
+
+def iter_file_results(worker: Callable[[str], Any], input_files: Sequence[str],
+                      jobs: int = 0) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Run worker on each input file in a process pool, yielding results as they finish.
+
+    Files are independent, so a batch is spread over up to one process per
+    file. A file whose worker raises does not stop the others; its error
+    message is yielded in place of a result.
+
+    Args:
+        worker: Picklable function taking one input file path
+        input_files: Input file paths
+        jobs: Number of worker processes (0 uses all CPUs, 1 runs in-process)
+
+    Yields:
+        (input file, worker result or None, error message or None), in
+        completion order
+    """
+    workers = min(jobs or os.cpu_count() or 1, len(input_files))
+
+    if workers <= 1:
+        for input_file in input_files:
+            try:
+                yield input_file, worker(input_file), None
+            except Exception as e:
+                yield input_file, None, str(e)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(worker, input_file): input_file for input_file in input_files}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, str(e)
+
+
 # ==============================================================================
 # File I/O Functions
 # ==============================================================================
 
+# First bytes that mark a header, sequence or dot-bracket structure line
+_HEADER_START = ord(">")
+_SEQUENCE_START = frozenset(b"atugcATUGC")
+_STRUCTURE_START = frozenset(b"(.)")
+
+
+def _clean_structure(structure: str) -> str:
+    """Keep the first token of a structure line and drop '&' and pseudoknot brackets."""
+    structure = structure.split()[0]  # Take first token
+    structure = structure.replace("&", ".")
+    structure = structure.replace("]", ".").replace("[", ".")  # Remove pseudoknots
+    return structure
+
+
+# Bytes scanned per chunk when parsing memory-mapped FASTA files
+_FASTA_CHUNK_SIZE = 1 << 22
+
+# Write buffer for FASTA output files
+_OUTPUT_BUFFER_SIZE = 1 << 18
+
+
+def _iter_record_chunks(mm: mmap.mmap):
+    """
+    Yield memory-mapped FASTA contents in chunks that end on a record boundary.
+
+    Boundaries are located by searching for a newline followed by '>' with
+    mmap.find (a C-level memchr scan), so only one chunk is copied out of
+    the mapping at a time.
+    """
+    pos = 0
+    end = len(mm)
+    while pos < end:
+        boundary = mm.find(b"\n>", pos + _FASTA_CHUNK_SIZE)
+        if boundary < 0:
+            boundary = end
+        yield mm[pos:boundary]
+        pos = boundary + 1
+
+
 def parse_fasta_with_structure(file_path: Path) -> List[Tuple[str, str, str]]:
     """
     Parse FASTA file with RNA sequences and secondary structures.
@@ -354,92 +676,125 @@ def parse_fasta_with_structure(file_path: Path) -> List[Tuple[str, str, str]]:
     SEQUENCE_STRING
     STRUCTURE_STRING (dot-bracket notation)
 
+    The file is memory-mapped and scanned as bytes; only the lines kept for
+    each record are decoded.
+
     Returns:
         List of (name, sequence, structure) tuples
     """
-    results = []
+    return list(iter_fasta_with_structure(file_path))
+
+
+def iter_fasta_with_structure(file_path: Path) -> Iterator[Tuple[str, str, str]]:
+    """
+    Lazily yield the (name, sequence, structure) records of a FASTA file.
 
-    with open(file_path) as f:
-        name = ""
-        sequence = ""
-        structure = ""
+    Same parser as parse_fasta_with_structure, but records are produced as
+    the memory-mapped file is scanned, so a single pass (such as a serial
+    extract_all_motifs) holds only the records it keeps rather than the
+    whole parsed file.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
 
-        for line in f:
-            line = line.strip()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            name = b""
+            sequence = b""
+            structure = b""
 
-            if line.startswith('>'):
-                # Save previous entry if complete
-                if name and sequence and structure:
-                    # Clean structure notation
-                    structure = structure.split()[0]  # Take first token
-                    structure = structure.replace("&", ".")
-                    structure = structure.replace("]", ".").replace("[", ".")  # Remove pseudoknots
-                    results.append((name, sequence, structure))
+            for chunk in _iter_record_chunks(mm):
+                for line in chunk.splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
 
-                # Start new entry
-                tokens = line.split('|')
-                name = tokens[0]
-                sequence = ""
-                structure = ""
+                    # One int lookup classifies the line; no per-line method calls
+                    first = line[0]
+                    if first == _HEADER_START:
+                        # Yield previous entry if complete
+                        if name and sequence and structure:
+                            yield (name.decode(), sequence.decode().upper(),
+                                   _clean_structure(structure.decode()))
 
-            elif line and line[0].lower() in ["a", "t", "u", "g", "c"]:
-                # Sequence line
-                sequence = line.upper()
+                        # Start new entry
+                        name = line.split(b'|', 1)[0]
+                        sequence = b""
+                        structure = b""
 
-            elif line and (line.startswith('(') or line.startswith('.') or line.startswith(')')):
-                # Structure line
-                structure = line
+                    elif first in _SEQUENCE_START:
+                        # Sequence line
+                        sequence = line
 
-        # Don't forget the last entry
-        if name and sequence and structure:
-            structure = structure.split()[0]
-            structure = structure.replace("&", ".")
-            structure = structure.replace("]", ".").replace("[", ".")
-            results.append((name, sequence, structure))
+                    elif first in _STRUCTURE_START:
+                        # Structure line
+                        structure = line
 
-    return results
+            # Don't forget the last entry
+            if name and sequence and structure:
+                yield (name.decode(), sequence.decode().upper(),
+                       _clean_structure(structure.decode()))
 
 
-def load_barcodes(file_path: Path) -> List[str]:
+def load_barcodes(file_path: Path, max_barcodes: Optional[int] = None) -> List[str]:
     """
     Load DNA barcodes from file.
 
+    With max_barcodes, the file is instead read line by line and reading
+    stops once that many barcodes are found, so sampling the head of a
+    100000-line file (as validate_input_format does) neither reads nor
+    keeps the rest.
+
     Args:
         file_path: Path to barcode file
+        max_barcodes: Maximum number of barcodes to load (None loads all)
 
     Returns:
         List of barcode sequences
     """
-    barcodes = []
-    with open(file_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and line[0].lower() in ["a", "t", "g", "c"]:
-                barcodes.append(line.upper())
-    return barcodes
+    if max_barcodes is not None:
+        with open(file_path, encoding='utf-8') as f:
+            barcodes = (line for line in (line.strip().upper() for line in f)
+                        if line and line[0] in "ATGC")
+            return list(islice(barcodes, max(max_barcodes, 0)))
+
+    # Read, decode and upper-case the whole file at once, then split it once
+    text = Path(file_path).read_bytes().decode().upper()
+    return [line for line in map(str.strip, text.splitlines())
+            if line and line[0] in "ATGC"]
+
 
+def _write_records(f, records) -> None:
+    """Write FASTA records separated by newlines, with no trailing newline."""
+    first = next(records, None)
+    if first is not None:
+        f.write(first)
+        f.writelines(f"\n{record}" for record in records)
 
-def save_fasta_results(results: Dict[str, List[str]], output_path: Optional[Path] = None) -> None:
+
+def save_fasta_results(results: Union[Dict[str, Sequence[str]], Iterable[Tuple[str, Sequence[str]]]],
+                       output_path: Optional[Path] = None) -> None:
     """
     Save results in FASTA format.
 
+    Records are formatted one at a time and streamed through a large write
+    buffer, so the whole output is never held in memory as one string.
+
     Args:
-        results: Dict mapping names to [structure, sequence] pairs
+        results: Dict mapping names to (structure, sequence) pairs, or an
+            iterable of (name, (structure, sequence)) items, which is consumed
+            lazily so records can be written as they are generated
         output_path: Optional file path to save (prints to stdout if None)
     """
-    output_lines = []
-
-    for name, (structure, sequence) in results.items():
-        if sequence and structure:
-            output_lines.append(f">{name}")
-            output_lines.append(sequence)
-            output_lines.append(structure)
-
-    output_text = '\n'.join(output_lines)
+    items = results.items() if isinstance(results, dict) else results
+    records = (f">{name}\n{sequence}\n{structure}"
+               for name, (structure, sequence) in items
+               if sequence and structure)
 
     if output_path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            f.write(output_text)
+        with open(output_path, 'w', buffering=_OUTPUT_BUFFER_SIZE) as f:
+            _write_records(f, records)
     else:
-        print(output_text)
\ No newline at end of file
+        _write_records(sys.stdout, records)
+        sys.stdout.write("\n")
@@ -25,10 +25,13 @@ import sys
 # Add scripts/lib to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from lib.forest_core import (
-    terminal_motif_extraction,
+    extract_all_motifs,
     parse_fasta_with_structure,
     load_barcodes,
-    conjugate_stem,
+    STEM_FORWARD,
+    STEM_REVERSE,
+    dna_to_rna,
+    dna_to_rna_many,
     save_fasta_results
 )
 
@@ -37,6 +40,7 @@ from lib.forest_core import (
 # ==============================================================================
 DEFAULT_CONFIG = {
     "max_length": 134,
+    "jobs": 1,
     "num_barcodes": 5,
     "barcode_prefix": "GGG",
     "stem_length": 17,
@@ -79,6 +83,9 @@ def run_library_design(
     barcodes_file = Path(barcodes_file)
     config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
 
+    if config['num_barcodes'] < 0:
+        raise ValueError(f"num_barcodes must be non-negative, got {config['num_barcodes']}")
+
     # Validate input files
     if not input_file.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
@@ -91,8 +98,10 @@ def run_library_design(
     except Exception as e:
         raise ValueError(f"Failed to parse input file: {e}")
 
+    # Only the first barcode is read for now; the rest are loaded once the
+    # number the motifs consume is known
     try:
-        barcodes = load_barcodes(barcodes_file)
+        barcodes = load_barcodes(barcodes_file, max_barcodes=1)
     except Exception as e:
         raise ValueError(f"Failed to parse barcodes file: {e}")
 
@@ -102,59 +111,65 @@ def run_library_design(
         raise ValueError("No valid barcodes found in barcodes file")
 
     # Extract motifs from all sequences
-    all_motifs = {}
-    processed_sequences = 0
-
-    for name, sequence, structure in parsed_data:
-        try:
-            motifs = terminal_motif_extraction(
-                name=name.lstrip('>'),  # Remove '>' prefix
-                seq=structure,
-                seq2=sequence,
-                max_length=config['max_length']
-            )
-            all_motifs.update(motifs)
-            processed_sequences += 1
-        except Exception as e:
-            print(f"Warning: Failed to process sequence {name}: {e}", file=sys.stderr)
-            continue
+    all_motifs, processed_sequences = extract_all_motifs(
+        parsed_data,
+        max_length=config['max_length'],
+        jobs=config['jobs']
+    )
 
     # Generate RNA library with barcodes
     rna_library = {}
     barcode_index = 0
-    used_barcodes = []
 
     # Get unique sequences for barcode calculation
-    unique_sequences = [seq_info[1] for seq_info in all_motifs.values() if seq_info[1]]
-    total_barcodes_needed = len(unique_sequences) * config['num_barcodes']
+    motifs_with_sequence = sum(1 for _, sequence in all_motifs.values() if sequence)
+    total_barcodes_needed = motifs_with_sequence * config['num_barcodes']
+
+    # Load just the barcodes the motifs consume; a shorter list means the
+    # file ran out first
+    if total_barcodes_needed > len(barcodes):
+        barcodes = load_barcodes(barcodes_file, max_barcodes=total_barcodes_needed)
 
     if total_barcodes_needed > len(barcodes):
         raise ValueError(f"Not enough barcodes: need {total_barcodes_needed}, have {len(barcodes)}")
 
     print(f"# Loading {len(barcodes)} barcodes", file=sys.stderr)
     print(f"# Number of barcodes per RNA structure: {config['num_barcodes']}", file=sys.stderr)
-    print(f"# Number of RNA structures: {len(unique_sequences)}", file=sys.stderr)
+    print(f"# Number of RNA structures: {motifs_with_sequence}", file=sys.stderr)
 
     # Generate barcoded library
+    barcode_prefix = config['barcode_prefix']
+    stem_forward = STEM_FORWARD[:config['stem_length']]
+    stem_reverse = STEM_REVERSE[:config['stem_length']]
+
+    # Every probe is dna_to_rna(barcode_prefix + barcode + conjugated motif),
+    # and dna_to_rna maps each base on its own, so the parts are converted
+    # separately: the prefix once, and the barcodes the loop can consume in
+    # one batch
+    prefix_rna = dna_to_rna(barcode_prefix)
+    barcode_rnas = dna_to_rna_many(barcodes[:total_barcodes_needed])
+
     for motif_name, (structure, sequence) in all_motifs.items():
         if not sequence or not structure:
             continue
 
+        # The stem-conjugated motif is shared by all of this motif's barcodes
+        conjugated_rna = dna_to_rna(f"{stem_forward}{sequence}{stem_reverse}")
+
         for barcode_id in range(1, config['num_barcodes'] + 1):
             if barcode_index >= len(barcodes):
                 break
 
             probe_name = f"{motif_name}_Barcode_{barcode_id}"
-            barcode = barcodes[barcode_index]
 
             # Create barcoded RNA probe: prefix + barcode + conjugated stem + sequence
-            conjugated_sequence = conjugate_stem(sequence, config['stem_length'])
-            probe_sequence = config['barcode_prefix'] + barcode + conjugated_sequence
-
-            rna_library[probe_name] = [structure, probe_sequence.upper().replace("T", "U")]
+            rna_library[probe_name] = [structure,
+                                       f"{prefix_rna}{barcode_rnas[barcode_index]}{conjugated_rna}"]
 
             barcode_index += 1
-            used_barcodes.append(barcode)
+
+    # Barcodes are consumed in file order, so the used ones are a prefix
+    used_barcodes = barcodes[:barcode_index]
 
     # Save output if requested
     output_path = None
@@ -171,7 +186,7 @@ def run_library_design(
         "total_motifs": len(all_motifs),
         "total_probes": len(rna_library),
         "barcodes_used": len(used_barcodes),
-        "barcodes_available": len(barcodes),
+        "barcodes_loaded": len(barcodes),
         "config": config
     }
 
@@ -203,6 +218,8 @@ def main():
                         help='Number of barcodes per RNA structure (default: 5)')
     parser.add_argument('--max_length', '-L', type=int, default=134,
                         help='Maximum motif length (default: 134)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for motif extraction (0 = all CPUs, default: 1)')
 
     args = parser.parse_args()
 
@@ -218,6 +235,8 @@ def main():
         cli_overrides['num_barcodes'] = args.num_barcodes
     if args.max_length != 134:
         cli_overrides['max_length'] = args.max_length
+    if args.jobs != 1:
+        cli_overrides['jobs'] = args.jobs
 
     try:
         # Run library design
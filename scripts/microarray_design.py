@@ -17,6 +17,7 @@ Example:
 # Minimal Imports (only essential packages)
 # ==============================================================================
 import argparse
+from itertools import chain
 from pathlib import Path
 from typing import Union, Optional, Dict, Any, List
 import json
@@ -25,10 +26,11 @@ import sys
 # Add scripts/lib to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from lib.forest_core import (
-    terminal_motif_extraction,
-    parse_fasta_with_structure,
+    iter_record_motifs,
+    iter_fasta_with_structure,
     load_barcodes,
     revcom,
+    revcom_many,
     save_fasta_results
 )
 
@@ -37,6 +39,7 @@ from lib.forest_core import (
 # ==============================================================================
 DEFAULT_CONFIG = {
     "max_length": 134,
+    "jobs": 1,
     "num_barcodes": 2,
     "barcode_prefix": "GGG",
     "output_format": "fasta",
@@ -78,84 +81,103 @@ def run_microarray_design(
     barcodes_file = Path(barcodes_file)
     config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
 
-    # Validate input files
-    if not input_file.exists():
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-    if not barcodes_file.exists():
-        raise FileNotFoundError(f"Barcodes file not found: {barcodes_file}")
+    if config['num_barcodes'] < 0:
+        raise ValueError(f"num_barcodes must be non-negative, got {config['num_barcodes']}")
 
-    # Parse input files
+    # Parse input files. Records are read lazily so a serial extraction
+    # handles them as they are parsed; the first one is read here to check
+    # the file holds any. Opening each file also checks that it exists, so
+    # neither is stat'ed separately first.
     try:
-        parsed_data = parse_fasta_with_structure(input_file)
+        records = iter_fasta_with_structure(input_file)
+        first_record = next(records, None)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {input_file}")
     except Exception as e:
         raise ValueError(f"Failed to parse input file: {e}")
 
+    # Only the first barcode is read for now; the rest are loaded once the
+    # number the motifs consume is known
     try:
-        barcodes = load_barcodes(barcodes_file)
+        barcodes = load_barcodes(barcodes_file, max_barcodes=1)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Barcodes file not found: {barcodes_file}")
     except Exception as e:
         raise ValueError(f"Failed to parse barcodes file: {e}")
 
-    if not parsed_data:
+    if first_record is None:
         raise ValueError("No valid sequences found in input file")
     if not barcodes:
         raise ValueError("No valid barcodes found in barcodes file")
 
-    # Extract motifs from all sequences
-    all_motifs = {}
+    # Extract motifs from all sequences. Capture probes depend only on the
+    # motif names, so each record's motifs are reduced to whether they get
+    # barcodes as they are extracted, and their sequences and structures
+    # are never accumulated.
+    motif_barcoded = {}
     processed_sequences = 0
-
-    for name, sequence, structure in parsed_data:
-        try:
-            motifs = terminal_motif_extraction(
-                name=name.lstrip('>'),  # Remove '>' prefix
-                seq=structure,
-                seq2=sequence,
-                max_length=config['max_length']
-            )
-            all_motifs.update(motifs)
-            processed_sequences += 1
-        except Exception as e:
-            print(f"Warning: Failed to process sequence {name}: {e}", file=sys.stderr)
-            continue
+    for motifs in iter_record_motifs(
+        chain((first_record,), records),
+        max_length=config['max_length'],
+        jobs=config['jobs']
+    ):
+        motif_barcoded.update((motif_name, bool(sequence and structure))
+                              for motif_name, (structure, sequence) in motifs.items())
+        processed_sequences += 1
 
     # Generate microarray barcodes
     array_barcodes = {}
     barcode_index = 0
-    used_barcodes = []
+
+    # Names of the motifs that get barcodes, as one column in output order,
+    # so the capture loop walks a plain list with no per-motif checks
+    barcoded_names = [motif_name for motif_name, barcoded in motif_barcoded.items() if barcoded]
 
     # Get unique sequences for barcode calculation
-    unique_sequences = [seq_info[1] for seq_info in all_motifs.values() if seq_info[1]]
-    total_barcodes_needed = len(unique_sequences) * config['num_barcodes']
+    motifs_with_sequence = len(barcoded_names)
+    total_barcodes_needed = motifs_with_sequence * config['num_barcodes']
+
+    # Load just the barcodes the motifs consume; a shorter list means the
+    # file ran out first
+    if total_barcodes_needed > len(barcodes):
+        barcodes = load_barcodes(barcodes_file, max_barcodes=total_barcodes_needed)
 
     if total_barcodes_needed > len(barcodes):
         raise ValueError(f"Not enough barcodes: need {total_barcodes_needed}, have {len(barcodes)}")
 
     print(f"# Loading {len(barcodes)} barcodes", file=sys.stderr)
     print(f"# Number of barcodes per RNA structure: {config['num_barcodes']}", file=sys.stderr)
-    print(f"# Number of RNA structures: {len(unique_sequences)}", file=sys.stderr)
-
-    # Generate microarray capture sequences
-    for motif_name, (structure, sequence) in all_motifs.items():
-        if not sequence or not structure:
-            continue
-
-        for barcode_id in range(1, config['num_barcodes'] + 1):
+    print(f"# Number of RNA structures: {motifs_with_sequence}", file=sys.stderr)
+
+    # Generate microarray capture sequences. Every capture sequence is
+    #   revcom(barcode_prefix + barcode) == revcom(barcode) + revcom(barcode_prefix)
+    # so the prefix is reverse-complemented once, and the barcodes the loop
+    # can consume are reverse-complemented in one batch
+    prefix_revcomp = revcom(config['barcode_prefix'])
+    capture_sequences = [f"{barcode_revcomp}{prefix_revcomp}"
+                         for barcode_revcomp in revcom_many(barcodes[:total_barcodes_needed])]
+
+    # The array-name suffix of each barcode slot is the same for every
+    # motif, so it is formatted once here
+    array_suffixes = [f"_Barcode_{barcode_id}_array"
+                      for barcode_id in range(1, config['num_barcodes'] + 1)]
+
+    for motif_name in barcoded_names:
+        for array_suffix in array_suffixes:
             if barcode_index >= len(barcodes):
                 break
 
-            array_name = f"{motif_name}_Barcode_{barcode_id}_array"
-            barcode = barcodes[barcode_index]
-
-            # Create microarray capture sequence: reverse complement of (prefix + barcode)
+            # Microarray capture sequence: reverse complement of (prefix + barcode)
             # This will hybridize to the barcode portion of the RNA probe
-            capture_target = config['barcode_prefix'] + barcode
-            capture_sequence = revcom(capture_target)
+            capture_sequence = capture_sequences[barcode_index]
 
             # Store the microarray barcode (for capture probe synthesis)
-            array_barcodes[array_name] = ["", capture_sequence]  # No structure for DNA
+            array_barcodes[motif_name + array_suffix] = ["", capture_sequence]  # No structure for DNA
 
             barcode_index += 1
-            used_barcodes.append(barcode)
+
+    # Barcodes are consumed in file order, so the used ones are a prefix
+    used_barcodes = barcodes[:barcode_index]
 
     # Save output if requested
     output_path = None
@@ -169,10 +191,10 @@ def run_microarray_design(
         "input_file": str(input_file),
         "barcodes_file": str(barcodes_file),
         "processed_sequences": processed_sequences,
-        "total_motifs": len(all_motifs),
+        "total_motifs": len(motif_barcoded),
         "total_array_barcodes": len(array_barcodes),
         "barcodes_used": len(used_barcodes),
-        "barcodes_available": len(barcodes),
+        "barcodes_loaded": len(barcodes),
         "config": config
     }
 
@@ -204,6 +226,8 @@ def main():
                         help='Number of barcodes per RNA structure (default: 2)')
     parser.add_argument('--max_length', '-L', type=int, default=134,
                         help='Maximum motif length (default: 134)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for motif extraction (0 = all CPUs, default: 1)')
 
     args = parser.parse_args()
 
@@ -219,6 +243,8 @@ def main():
         cli_overrides['num_barcodes'] = args.num_barcodes
     if args.max_length != 134:
         cli_overrides['max_length'] = args.max_length
+    if args.jobs != 1:
+        cli_overrides['jobs'] = args.jobs
 
     try:
         # Run microarray design
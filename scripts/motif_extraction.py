@@ -8,6 +8,7 @@ Dependencies Removed: subprocess calls to FOREST.py, repo path dependencies
 
 Usage:
     python scripts/motif_extraction.py --input <input_file> --output <output_file>
+    python scripts/motif_extraction.py --inputs <file1,file2,...> --output_dir <output_dir>
 
 Example:
     python scripts/motif_extraction.py --input examples/data/test.fa.txt --output results/motifs.txt
@@ -17,16 +18,19 @@ Example:
 # Minimal Imports (only essential packages)
 # ==============================================================================
 import argparse
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Union, Optional, Dict, Any
+from typing import Union, Optional, Dict, Any, Sequence
 import json
 import sys
 
 # Add scripts/lib to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from lib.forest_core import (
-    terminal_motif_extraction,
-    parse_fasta_with_structure,
+    extract_all_motifs,
+    iter_fasta_with_structure,
+    iter_file_results,
     save_fasta_results
 )
 
@@ -35,6 +39,7 @@ from lib.forest_core import (
 # ==============================================================================
 DEFAULT_CONFIG = {
     "max_length": 134,
+    "jobs": 1,
     "output_format": "fasta",
     "include_metadata": True
 }
@@ -71,48 +76,45 @@ def run_motif_extraction(
     input_file = Path(input_file)
     config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
 
-    if not input_file.exists():
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-
-    # Parse input file
+    # Parse input file. Records are read lazily so a serial extraction
+    # handles them as they are parsed; the first one is read here to check
+    # the file holds any. Opening it also checks that it exists, so it is
+    # not stat'ed separately first.
     try:
-        parsed_data = parse_fasta_with_structure(input_file)
+        records = iter_fasta_with_structure(input_file)
+        first_record = next(records, None)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {input_file}")
     except Exception as e:
         raise ValueError(f"Failed to parse input file: {e}")
 
-    if not parsed_data:
+    if first_record is None:
         raise ValueError("No valid sequences found in input file")
 
-    # Extract motifs from all sequences
-    all_motifs = {}
-    processed_sequences = 0
-
-    for name, sequence, structure in parsed_data:
-        try:
-            motifs = terminal_motif_extraction(
-                name=name.lstrip('>'),  # Remove '>' prefix
-                seq=structure,
-                seq2=sequence,
-                max_length=config['max_length']
-            )
-            all_motifs.update(motifs)
-            processed_sequences += 1
-        except Exception as e:
-            print(f"Warning: Failed to process sequence {name}: {e}", file=sys.stderr)
-            continue
+    records = chain((first_record,), records)
 
-    # Save output if requested
     output_path = None
     if output_file:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Extract motifs from all sequences
+    all_motifs, processed_sequences = extract_all_motifs(
+        records,
+        max_length=config['max_length'],
+        jobs=config['jobs']
+    )
+    total_motifs = len(all_motifs)
+
+    # Save output if requested
+    if output_path:
         save_fasta_results(all_motifs, output_path)
 
     # Prepare metadata
     metadata = {
         "input_file": str(input_file),
         "processed_sequences": processed_sequences,
-        "total_motifs": len(all_motifs),
+        "total_motifs": total_motifs,
         "config": config
     }
 
@@ -123,6 +125,66 @@ def run_motif_extraction(
     }
 
 
+# ==============================================================================
+# Batch Processing
+# ==============================================================================
+def _extract_file(input_file: str, output_dir: Path, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract one file of a batch into <output_dir>/<file stem>/motifs.txt; returns its metadata."""
+    output_file = output_dir / Path(input_file).stem / "motifs.txt"
+    return run_motif_extraction(input_file, output_file, config=config)['metadata']
+
+
+def run_batch_motif_extraction(
+    input_files: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    config: Optional[Dict[str, Any]] = None,
+    workers: int = 0,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Extract RNA terminal motifs from several FASTA files in parallel.
+
+    Files are independent, so each one is handled by its own worker process
+    and written to its own subdirectory of output_dir. Motifs are streamed
+    to disk and only each file's metadata is sent back. A file that fails
+    is reported without stopping the rest.
+
+    Args:
+        input_files: Paths to FASTA files with RNA sequences and structures
+        output_dir: Directory to save outputs (one subdirectory per file)
+        config: Configuration dict (uses DEFAULT_CONFIG if not provided)
+        workers: Number of files processed at once (0 uses all CPUs)
+        **kwargs: Override specific config parameters
+
+    Returns:
+        Dict containing:
+            - results: Metadata of each successfully processed file
+            - errors: Error message of each failed file
+            - output_dir: Path to output directory
+    """
+    output_dir = Path(output_dir)
+    config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
+    input_files = [str(input_file) for input_file in input_files]
+
+    results = {}
+    errors = {}
+    worker = partial(_extract_file, output_dir=output_dir, config=config)
+    for input_file, metadata, error in iter_file_results(worker, input_files, jobs=workers):
+        if error is not None:
+            errors[input_file] = error
+            print(f"❌ {input_file}: {error}", file=sys.stderr)
+        else:
+            results[input_file] = metadata
+            print(f"✅ {input_file}: {metadata['total_motifs']} motifs from "
+                  f"{metadata['processed_sequences']} sequences", file=sys.stderr)
+
+    return {
+        "results": results,
+        "errors": errors,
+        "output_dir": str(output_dir)
+    }
+
+
 # ==============================================================================
 # CLI Interface
 # ==============================================================================
@@ -131,14 +193,21 @@ def main():
         description=__doc__,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument('--input', '-i', required=True,
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--input', '-i',
                         help='Input FASTA file with RNA sequences and structures')
+    inputs.add_argument('--inputs',
+                        help='Comma-separated input FASTA files, processed in parallel')
     parser.add_argument('--output', '-o',
                         help='Output file path (default: stdout)')
+    parser.add_argument('--output_dir',
+                        help='Output directory for --inputs (default: directory of --output)')
     parser.add_argument('--config', '-c',
                         help='Config file (JSON)')
     parser.add_argument('--max_length', '-L', type=int, default=134,
                         help='Maximum motif length (default: 134)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for motif extraction (0 = all CPUs, default: 1)')
 
     args = parser.parse_args()
 
@@ -152,6 +221,26 @@ def main():
     cli_overrides = {}
     if args.max_length != 134:  # Only override if not default
         cli_overrides['max_length'] = args.max_length
+    if args.jobs != 1:
+        cli_overrides['jobs'] = args.jobs
+
+    if args.inputs:
+        output_dir = args.output_dir or (Path(args.output).parent if args.output else None)
+        if output_dir is None:
+            parser.error("--inputs requires --output_dir")
+
+        result = run_batch_motif_extraction(
+            input_files=args.inputs.split(","),
+            output_dir=output_dir,
+            config=config,
+            **cli_overrides
+        )
+        print(f"✅ Processed {len(result['results'])} files, results saved to: {result['output_dir']}",
+              file=sys.stderr)
+        if result['errors']:
+            print(f"❌ {len(result['errors'])} files failed", file=sys.stderr)
+            sys.exit(1)
+        return result
 
     try:
         # Run extraction
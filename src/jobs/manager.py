@@ -1,15 +1,32 @@
 """Job management for long-running tasks."""
 
 import uuid
+import asyncio
+import copy
+import io
 import json
+import os
 import subprocess
+import sys
 import threading
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, List, Set
 from enum import Enum
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib json module is used without it
+    orjson = None
+
+# Bytes read at a time when tailing or counting job log lines
+_LOG_BLOCK_SIZE = 1 << 16
+
+# Job logs whose running line counts are kept, most recently counted last
+_LOG_COUNT_CACHE_SIZE = 256
+
 class JobStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -23,7 +40,19 @@ class JobManager:
     def __init__(self, jobs_dir: Path = None):
         self.jobs_dir = jobs_dir or Path(__file__).parent.parent.parent / "jobs"
         self.jobs_dir.mkdir(parents=True, exist_ok=True)
-        self._running_jobs: Dict[str, subprocess.Popen] = {}
+        # subprocess.Popen or asyncio.subprocess.Process; both have terminate()
+        self._running_jobs: Dict[str, Any] = {}
+        # Strong references to job tasks, which the event loop only holds weakly
+        self._job_tasks: Set[asyncio.Task] = set()
+        # job_id -> ((mtime_ns, size) of metadata.json, parsed metadata)
+        self._metadata_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        # Held while metadata.json is written or read and the cache updated,
+        # since job tasks and the a*-wrappers do both in worker threads
+        self._metadata_lock = threading.Lock()
+        # log path -> (bytes counted, line endings in them, last byte counted),
+        # in least recently counted order; get_job_log runs in worker threads
+        self._log_line_counts: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+        self._log_count_lock = threading.Lock()
 
     def submit_job(
         self,
@@ -70,71 +99,164 @@ class JobManager:
         }
 
     def _start_job(self, job_id: str, script_path: str, args: Dict, job_dir: Path):
-        """Start job execution in background thread."""
-        def run_job():
-            metadata = self._load_metadata(job_id)
-            metadata["status"] = JobStatus.RUNNING.value
-            metadata["started_at"] = datetime.now().isoformat()
-            self._save_metadata(job_id, metadata)
+        """Start job execution in the background.
 
-            try:
-                # Build command for mamba environment
-                cmd = ["mamba", "run", "-p", "./env", "python", script_path]
-
-                # Add script arguments
-                for key, value in args.items():
-                    if value is not None:
-                        if key.startswith("--"):
-                            cmd.append(key)
-                        else:
-                            cmd.append(f"--{key}")
-                        cmd.append(str(value))
-
-                # Set job directory as output base if not specified
-                if "--output" not in [str(arg) for arg in cmd] and "--output_dir" not in [str(arg) for arg in cmd]:
-                    cmd.extend(["--output", str(job_dir / "results.txt")])
-
-                # Run script
-                log_file = job_dir / "job.log"
-                with open(log_file, 'w') as log:
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=log,
-                        stderr=subprocess.STDOUT,
-                        cwd=str(Path(script_path).parent.parent)
-                    )
-                    self._running_jobs[job_id] = process
-                    process.wait()
-
-                # Update status
-                if process.returncode == 0:
-                    metadata["status"] = JobStatus.COMPLETED.value
-                    # Save output info
-                    metadata["output_files"] = self._find_output_files(job_dir)
+        Under a running event loop (the MCP server's), the job is an asyncio
+        task that awaits its process on the loop's own selector, so no
+        thread is created per job. Without one, a thread waits on it.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            task = loop.create_task(self._run_job_async(job_id, script_path, args, job_dir))
+            self._job_tasks.add(task)
+            task.add_done_callback(self._job_tasks.discard)
+        else:
+            thread = threading.Thread(target=self._run_job, args=(job_id, script_path, args, job_dir),
+                                      daemon=True)
+            thread.start()
+
+    def _build_command(self, script_path: str, args: Dict, job_dir: Path) -> List[str]:
+        """Build the command line that runs script_path with args."""
+        # Run the script with the server's own interpreter, which already
+        # lives in the FOREST environment, rather than through `mamba run`
+        # and its per-job environment activation. Jobs stay in a child
+        # process so their output can go to the job log (the server's stdout
+        # carries the MCP transport) and cancel_job can terminate them.
+        cmd = [sys.executable, script_path]
+
+        # Add script arguments
+        for key, value in args.items():
+            if value is not None:
+                if key.startswith("--"):
+                    cmd.append(key)
                 else:
-                    metadata["status"] = JobStatus.FAILED.value
-                    metadata["error"] = f"Process exited with code {process.returncode}"
+                    cmd.append(f"--{key}")
+                cmd.append(str(value))
 
-            except Exception as e:
-                metadata["status"] = JobStatus.FAILED.value
-                metadata["error"] = str(e)
-                logger.error(f"Job {job_id} failed: {e}")
+        # Set job directory as output base if not specified
+        if "--output" not in cmd and "--output_dir" not in cmd:
+            cmd.extend(["--output", str(job_dir / "results.txt")])
 
-            finally:
-                metadata["completed_at"] = datetime.now().isoformat()
-                self._save_metadata(job_id, metadata)
-                self._running_jobs.pop(job_id, None)
+        return cmd
+
+    def _mark_running(self, job_id: str) -> Dict:
+        """Record that a job has started and return its metadata."""
+        metadata = self._load_metadata(job_id)
+        metadata["status"] = JobStatus.RUNNING.value
+        metadata["started_at"] = datetime.now().isoformat()
+        self._save_metadata(job_id, metadata)
+        return metadata
+
+    def _record_exit(self, metadata: Dict, returncode: int, job_dir: Path):
+        """Update job metadata from its process exit code."""
+        if returncode == 0:
+            metadata["status"] = JobStatus.COMPLETED.value
+            # Save output info
+            metadata["output_files"] = self._find_output_files(job_dir)
+        else:
+            metadata["status"] = JobStatus.FAILED.value
+            metadata["error"] = f"Process exited with code {returncode}"
+
+    def _record_failure(self, job_id: str, metadata: Dict, error: Exception):
+        """Update job metadata for a job that could not be run."""
+        metadata["status"] = JobStatus.FAILED.value
+        metadata["error"] = str(error)
+        logger.error(f"Job {job_id} failed: {error}")
+
+    def _record_completion(self, job_id: str, metadata: Dict):
+        """Save the final job metadata and forget its process."""
+        metadata["completed_at"] = datetime.now().isoformat()
+        self._save_metadata(job_id, metadata)
+        self._running_jobs.pop(job_id, None)
 
-        thread = threading.Thread(target=run_job, daemon=True)
-        thread.start()
+    def _run_job(self, job_id: str, script_path: str, args: Dict, job_dir: Path):
+        """Run a job to completion, blocking the calling thread."""
+        metadata = self._mark_running(job_id)
+
+        try:
+            cmd = self._build_command(script_path, args, job_dir)
+
+            # Run script
+            log_file = job_dir / "job.log"
+            with open(log_file, 'w') as log:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    cwd=str(Path(script_path).parent.parent)
+                )
+                self._running_jobs[job_id] = process
+                process.wait()
+
+            # Update status
+            self._record_exit(metadata, process.returncode, job_dir)
+
+        except Exception as e:
+            self._record_failure(job_id, metadata, e)
+
+        finally:
+            self._record_completion(job_id, metadata)
+
+    async def _run_job_async(self, job_id: str, script_path: str, args: Dict, job_dir: Path):
+        """Run a job to completion as a task on the running event loop.
+
+        Metadata reads and writes, opening the log and the output-file walk
+        are blocking file I/O, so they run in worker threads; only the wait
+        on the process stays on the loop.
+        """
+        metadata = await asyncio.to_thread(self._mark_running, job_id)
+
+        try:
+            cmd = self._build_command(script_path, args, job_dir)
+
+            # Run script
+            log_file = job_dir / "job.log"
+            log = await asyncio.to_thread(open, log_file, 'w')
+            with log:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=log,
+                    stderr=asyncio.subprocess.STDOUT,
+                    cwd=str(Path(script_path).parent.parent)
+                )
+                self._running_jobs[job_id] = process
+                await process.wait()
+
+            # Update status
+            await asyncio.to_thread(self._record_exit, metadata, process.returncode, job_dir)
+
+        except Exception as e:
+            self._record_failure(job_id, metadata, e)
+
+        finally:
+            await asyncio.to_thread(self._record_completion, job_id, metadata)
 
     def _find_output_files(self, job_dir: Path) -> list:
-        """Find output files created by the job."""
+        """Find output files created by the job.
+
+        Walks the job directory with os.scandir, whose entries carry their
+        file type from the directory listing, so no Path object or stat call
+        is needed per file. A subdirectory that vanishes or cannot be read
+        mid-walk is skipped rather than failing the job. Paths are returned
+        sorted, so the listing does not depend on directory order.
+        """
         output_files = []
-        for file_path in job_dir.glob("**/*"):
-            if file_path.is_file() and file_path.name not in ["metadata.json", "job.log"]:
-                output_files.append(str(file_path))
-        return output_files
+        pending_dirs = [str(job_dir)]
+        while pending_dirs:
+            try:
+                with os.scandir(pending_dirs.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                        elif entry.is_file() and entry.name not in ("metadata.json", "job.log"):
+                            output_files.append(entry.path)
+            except OSError:
+                continue
+        return sorted(output_files)
 
     def get_job_status(self, job_id: str) -> Dict[str, Any]:
         """Get status of a submitted job."""
@@ -158,6 +280,14 @@ class JobManager:
 
         return result
 
+    async def aget_job_status(self, job_id: str) -> Dict[str, Any]:
+        """get_job_status for callers on an event loop.
+
+        The metadata stat and read run in a worker thread, so clients polling
+        job status do not stall the MCP server's loop or the job tasks on it.
+        """
+        return await asyncio.to_thread(self.get_job_status, job_id)
+
     def get_job_result(self, job_id: str) -> Dict[str, Any]:
         """Get results of a completed job."""
         metadata = self._load_metadata(job_id)
@@ -190,18 +320,90 @@ class JobManager:
             return {"status": "error", "error": f"Log not found for job {job_id}"}
 
         try:
-            with open(log_file) as f:
-                lines = f.readlines()
+            if tail > 0:
+                lines = self._tail_lines(log_file, tail)
+                total_lines = self._count_lines(log_file)
+            else:
+                with open(log_file) as f:
+                    lines = f.readlines()
+                total_lines = len(lines)
 
             return {
                 "status": "success",
                 "job_id": job_id,
-                "log_lines": lines[-tail:] if tail > 0 else lines,
-                "total_lines": len(lines)
+                "log_lines": lines,
+                "total_lines": total_lines
             }
         except Exception as e:
             return {"status": "error", "error": f"Failed to read log: {e}"}
 
+    async def aget_job_log(self, job_id: str, tail: int = 50) -> Dict[str, Any]:
+        """get_job_log for callers on an event loop; the log is read in a worker thread."""
+        return await asyncio.to_thread(self.get_job_log, job_id, tail)
+
+    def _tail_lines(self, log_file: Path, tail: int) -> list:
+        """Read the last tail lines of a log by seeking back from its end.
+
+        Blocks are read backwards, each one once, until they hold more than
+        tail line endings, so only the end of a large log is read rather than
+        the whole file. Every line ending holds a \n or a \r, so the larger
+        of the two counts never overstates the lines read.
+        """
+        with open(log_file, 'rb') as f:
+            start = f.seek(0, os.SEEK_END)
+            blocks = []
+            newlines = returns = 0
+            while start > 0 and max(newlines, returns) <= tail:
+                block_start = max(0, start - _LOG_BLOCK_SIZE)
+                f.seek(block_start)
+                block = f.read(start - block_start)
+                blocks.append(block)
+                newlines += block.count(b"\n")
+                returns += block.count(b"\r")
+                start = block_start
+
+        # Decode like a text-mode open; the first line is partial unless the
+        # read reached the start of the file
+        data = b"".join(reversed(blocks))
+        lines = io.TextIOWrapper(io.BytesIO(data), errors="replace").readlines()
+        if start > 0:
+            lines = lines[1:]
+        return lines[-tail:]
+
+    def _count_lines(self, log_file: Path) -> int:
+        """Count the lines of a log in fixed-size blocks, without holding it in memory.
+
+        Lines are split like text-mode readlines, so \n, \r and \r\n each end
+        one line and carriage-return progress output counts the same here as
+        in the lines returned.
+
+        Job logs only grow while a job runs, so the count so far is kept per
+        log and each call reads just the bytes appended since the last one;
+        polling a running job's log no longer rescans it from the start.
+        A log that shrank (rewritten by a new run) is counted afresh. Only
+        the _LOG_COUNT_CACHE_SIZE most recently counted logs are kept.
+        """
+        key = str(log_file)
+        with self._log_count_lock:
+            offset, total, last = self._log_line_counts.pop(key, (0, 0, b""))
+        with open(log_file, 'rb') as f:
+            if f.seek(0, os.SEEK_END) < offset:
+                offset, total, last = 0, 0, b""
+            f.seek(offset)
+            for block in iter(lambda: f.read(_LOG_BLOCK_SIZE), b""):
+                total += block.count(b"\n") + block.count(b"\r") - block.count(b"\r\n")
+                # A \r\n split across two reads is one line ending
+                if last == b"\r" and block[:1] == b"\n":
+                    total -= 1
+                last = block[-1:]
+                offset += len(block)
+        with self._log_count_lock:
+            self._log_line_counts[key] = (offset, total, last)
+            while len(self._log_line_counts) > _LOG_COUNT_CACHE_SIZE:
+                self._log_line_counts.popitem(last=False)
+        # A final line without a line ending still counts
+        return total + (last not in (b"", b"\n", b"\r"))
+
     def cancel_job(self, job_id: str) -> Dict[str, Any]:
         """Cancel a running job."""
         if job_id in self._running_jobs:
@@ -223,49 +425,91 @@ class JobManager:
         return {"status": "error", "error": f"Job {job_id} not running"}
 
     def list_jobs(self, status: Optional[str] = None) -> Dict[str, Any]:
-        """List all jobs, optionally filtered by status."""
+        """List all jobs, optionally filtered by status.
+
+        Job directories are listed with os.scandir, whose entries carry their
+        file type, and each job's metadata comes from the metadata cache, so
+        a repeated listing costs one stat per job.
+        """
         jobs = []
         if not self.jobs_dir.exists():
             return {"status": "success", "jobs": [], "total": 0}
 
-        for job_dir in self.jobs_dir.iterdir():
-            if job_dir.is_dir():
-                metadata = self._load_metadata(job_dir.name)
-                if metadata:
-                    if status is None or metadata["status"] == status:
-                        jobs.append({
-                            "job_id": metadata["job_id"],
-                            "job_name": metadata.get("job_name"),
-                            "status": metadata["status"],
-                            "submitted_at": metadata.get("submitted_at"),
-                            "script": metadata.get("script", "").split("/")[-1] if metadata.get("script") else "unknown"
-                        })
+        with os.scandir(self.jobs_dir) as entries:
+            job_ids = [entry.name for entry in entries if entry.is_dir()]
+
+        for job_id in job_ids:
+            metadata = self._load_metadata(job_id)
+            if metadata:
+                if status is None or metadata["status"] == status:
+                    jobs.append({
+                        "job_id": metadata["job_id"],
+                        "job_name": metadata.get("job_name"),
+                        "status": metadata["status"],
+                        "submitted_at": metadata.get("submitted_at"),
+                        "script": metadata.get("script", "").split("/")[-1] if metadata.get("script") else "unknown"
+                    })
 
         # Sort by submission time (newest first)
         jobs.sort(key=lambda x: x.get("submitted_at", ""), reverse=True)
 
         return {"status": "success", "jobs": jobs, "total": len(jobs)}
 
+    async def alist_jobs(self, status: Optional[str] = None) -> Dict[str, Any]:
+        """list_jobs for callers on an event loop; the jobs directory is scanned in a worker thread."""
+        return await asyncio.to_thread(self.list_jobs, status)
+
     def _save_metadata(self, job_id: str, metadata: Dict):
         """Save job metadata to disk."""
-        meta_file = self.jobs_dir / job_id / "metadata.json"
-        meta_file.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            with open(meta_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save metadata for job {job_id}: {e}")
+        with self._metadata_lock:
+            meta_file = self.jobs_dir / job_id / "metadata.json"
+            meta_file.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if orjson is not None:
+                    meta_file.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+                else:
+                    with open(meta_file, 'w') as f:
+                        json.dump(metadata, f, indent=2)
+                # Remember what was just written so the next load needn't re-read it
+                stat = meta_file.stat()
+                self._metadata_cache[job_id] = ((stat.st_mtime_ns, stat.st_size), copy.deepcopy(metadata))
+            except Exception as e:
+                self._metadata_cache.pop(job_id, None)
+                logger.error(f"Failed to save metadata for job {job_id}: {e}")
 
     def _load_metadata(self, job_id: str) -> Optional[Dict]:
-        """Load job metadata from disk."""
-        meta_file = self.jobs_dir / job_id / "metadata.json"
-        if meta_file.exists():
+        """Load job metadata from disk.
+
+        Parsed metadata is cached per job and reused while metadata.json keeps
+        the same modification time and size, so polling get_job_status or
+        list_jobs costs one stat per job rather than a read and JSON parse.
+        Callers get their own deep copy, which they may update and save.
+        """
+        with self._metadata_lock:
+            meta_file = self.jobs_dir / job_id / "metadata.json"
             try:
-                with open(meta_file) as f:
-                    return json.load(f)
+                stat = meta_file.stat()
+            except OSError:
+                self._metadata_cache.pop(job_id, None)
+                return None
+
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._metadata_cache.get(job_id)
+            if cached is not None and cached[0] == key:
+                return copy.deepcopy(cached[1])
+
+            try:
+                if orjson is not None:
+                    metadata = orjson.loads(meta_file.read_bytes())
+                else:
+                    with open(meta_file) as f:
+                        metadata = json.load(f)
             except Exception as e:
                 logger.error(f"Failed to load metadata for job {job_id}: {e}")
-        return None
+                return None
+
+            self._metadata_cache[job_id] = (key, metadata)
+            return copy.deepcopy(metadata)
 
 # Global job manager instance
 job_manager = JobManager()
\ No newline at end of file
@@ -6,8 +6,10 @@ analysis of RNA secondary structures for probe design and molecular applications
 """
 
 from fastmcp import FastMCP
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
+import os
 import sys
 import json
 
@@ -30,7 +32,7 @@ mcp = FastMCP("FOREST")
 # ==============================================================================
 
 @mcp.tool()
-def get_job_status(job_id: str) -> dict:
+async def get_job_status(job_id: str) -> dict:
     """
     Get the status of a submitted job.
 
@@ -40,7 +42,7 @@ def get_job_status(job_id: str) -> dict:
     Returns:
         Dictionary with job status, timestamps, and any errors
     """
-    return job_manager.get_job_status(job_id)
+    return await job_manager.aget_job_status(job_id)
 
 @mcp.tool()
 def get_job_result(job_id: str) -> dict:
@@ -56,7 +58,7 @@ def get_job_result(job_id: str) -> dict:
     return job_manager.get_job_result(job_id)
 
 @mcp.tool()
-def get_job_log(job_id: str, tail: int = 50) -> dict:
+async def get_job_log(job_id: str, tail: int = 50) -> dict:
     """
     Get log output from a running or completed job.
 
@@ -67,7 +69,7 @@ def get_job_log(job_id: str, tail: int = 50) -> dict:
     Returns:
         Dictionary with log lines and total line count
     """
-    return job_manager.get_job_log(job_id, tail)
+    return await job_manager.aget_job_log(job_id, tail)
 
 @mcp.tool()
 def cancel_job(job_id: str) -> dict:
@@ -83,7 +85,7 @@ def cancel_job(job_id: str) -> dict:
     return job_manager.cancel_job(job_id)
 
 @mcp.tool()
-def list_jobs(status: Optional[str] = None) -> dict:
+async def list_jobs(status: Optional[str] = None) -> dict:
     """
     List all submitted jobs.
 
@@ -93,7 +95,7 @@ def list_jobs(status: Optional[str] = None) -> dict:
     Returns:
         List of jobs with their status
     """
-    return job_manager.list_jobs(status)
+    return await job_manager.alist_jobs(status)
 
 # ==============================================================================
 # Synchronous Tools (for fast operations < 2 min)
@@ -627,29 +629,14 @@ def validate_input_format(
     Example:
         validate_input_format("examples/data/test.fa.txt", "fasta_structure")
     """
+    if format_type not in ("fasta_structure", "barcodes"):
+        return {"status": "error", "error": f"Unknown format type: {format_type}"}
+
     try:
-        from lib.forest_core import parse_fasta_with_structure, load_barcodes
-
-        if format_type == "fasta_structure":
-            sequences = parse_fasta_with_structure(input_file)
-            return {
-                "status": "success",
-                "format": "fasta_structure",
-                "sequences": len(sequences),
-                "valid": True,
-                "message": f"Valid FASTA file with {len(sequences)} sequences"
-            }
-        elif format_type == "barcodes":
-            barcodes = load_barcodes(input_file, max_barcodes=10)  # Test load first 10
-            return {
-                "status": "success",
-                "format": "barcodes",
-                "barcodes_sample": len(barcodes),
-                "valid": True,
-                "message": f"Valid barcode file (tested first 10)"
-            }
-        else:
-            return {"status": "error", "error": f"Unknown format type: {format_type}"}
+        # Results are cached on the file's size and modification time, so
+        # revalidating an unchanged file skips the parse
+        stat = os.stat(input_file)
+        return dict(_validate_cached(os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns, format_type))
 
     except Exception as e:
         return {
@@ -658,6 +645,31 @@ def validate_input_format(
             "error": str(e)
         }
 
+@lru_cache(maxsize=128)
+def _validate_cached(input_file: str, size: int, mtime_ns: int, format_type: str) -> dict:
+    """Validate input_file once per (size, mtime_ns); see validate_input_format."""
+    from lib.forest_core import iter_fasta_with_structure, load_barcodes
+
+    if format_type == "fasta_structure":
+        # Records are only counted, so they are streamed rather than kept
+        sequences = sum(1 for _ in iter_fasta_with_structure(input_file))
+        return {
+            "status": "success",
+            "format": "fasta_structure",
+            "sequences": sequences,
+            "valid": True,
+            "message": f"Valid FASTA file with {sequences} sequences"
+        }
+    else:
+        barcodes = load_barcodes(input_file, max_barcodes=10)  # Test load first 10
+        return {
+            "status": "success",
+            "format": "barcodes",
+            "barcodes_sample": len(barcodes),
+            "valid": True,
+            "message": f"Valid barcode file (tested first 10)"
+        }
+
 @mcp.tool()
 def get_example_data() -> dict:
     """
@@ -669,19 +681,22 @@ def get_example_data() -> dict:
     examples_dir = MCP_ROOT / "examples" / "data"
     examples = []
 
+    # os.scandir entries carry their file type from the listing, so each
+    # file costs one stat, for its size
     if examples_dir.exists():
-        for file_path in examples_dir.glob("*"):
-            if file_path.is_file():
-                try:
-                    size = file_path.stat().st_size
-                    examples.append({
-                        "name": file_path.name,
-                        "path": str(file_path),
-                        "size_bytes": size,
-                        "size_human": f"{size / 1024:.1f} KB" if size > 1024 else f"{size} bytes"
-                    })
-                except:
-                    pass
+        with os.scandir(examples_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    try:
+                        size = entry.stat().st_size
+                        examples.append({
+                            "name": entry.name,
+                            "path": entry.path,
+                            "size_bytes": size,
+                            "size_human": f"{size / 1024:.1f} KB" if size > 1024 else f"{size} bytes"
+                        })
+                    except OSError:
+                        pass
 
     return {
         "status": "success",
@@ -0,0 +1,262 @@
+"""Tests for the shared FOREST library."""
+
+import mmap
+import random
+
+import pytest
+
+from lib import forest_core
+from lib.forest_core import (
+    _iter_record_chunks,
+    _rename_motifs,
+    _nth_find,
+    _nth_rfind,
+    extract_all_motifs,
+    hitpoint_brew,
+    hitpoint_counter,
+    packman,
+    iter_fasta_with_structure,
+    iter_record_motifs,
+    load_barcodes,
+    parse_fasta_with_structure,
+    revcom,
+    revcom_many,
+    terminal_motif_extraction,
+)
+
+
+def _reference_parse(file_path):
+    """The original line-by-line parser, which the mmap scanner must match."""
+    results = []
+    name = sequence = structure = ""
+    with open(file_path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('>'):
+                if name and sequence and structure:
+                    results.append((name, sequence, forest_core._clean_structure(structure)))
+                name = line.split('|')[0]
+                sequence = structure = ""
+            elif line and line[0].lower() in "atugc":
+                sequence = line.upper()
+            elif line and line[0] in "(.)":
+                structure = line
+    if name and sequence and structure:
+        results.append((name, sequence, forest_core._clean_structure(structure)))
+    return results
+
+
+def _reference_revcom(seq):
+    """The original chained-replace reverse complement."""
+    seq = seq.upper()
+    seq = seq.replace("A", "t")
+    seq = seq.replace("U", "a")
+    seq = seq.replace("T", "a")
+    seq = seq.replace("G", "c")
+    seq = seq.replace("C", "g")
+    return seq[::-1].upper()
+
+
+def _random_sequences(count, alphabet="ACGTUacgtuN-", seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+def _reference_hitpoint_brew(hitpoint, seq):
+    """The original per-character hitpoint_brew."""
+    i = 0
+    while hitpoint != 0 and i < len(seq):
+        if seq[i] == ")" or seq[i] == "(":
+            hitpoint -= 1
+        i += 1
+    return seq[0:i]
+
+
+def _reference_hitpoint_counter(hitpoint, seq, bracket):
+    """The original hitpoint_counter, which re-counts every candidate partition."""
+    partition = ""
+    i = 0
+    if bracket == ")":
+        while hitpoint != partition.count(bracket) and i < len(seq):
+            partition = seq[0:i]
+            i += 1
+        return partition
+    elif bracket == "(":
+        seq_rev = seq[::-1]
+        while hitpoint != partition.count(bracket) and i < len(seq_rev):
+            partition = seq_rev[0:i]
+            i += 1
+        return partition[::-1]
+    return ""
+
+
+def _reference_packman(seq):
+    """The original packman, which re-counts every candidate prefix and suffix."""
+    if not seq or "." not in seq:
+        return seq
+    i = 0
+    t = 0
+    while i < len(seq) and seq[i] != ".":
+        i += 1
+    while t < len(seq) and seq[len(seq)-1-t] != ".":
+        t += 1
+    pack_num = max(i, t)
+
+    i = 0
+    t = 0
+    while i < len(seq) and seq[:i].count("(") != pack_num:
+        i += 1
+    while t < len(seq) and seq[len(seq)-1-t:len(seq)].count(")") != pack_num:
+        t += 1
+
+    if i < len(seq) and t < len(seq):
+        return seq[i:len(seq)-1-t].strip('.')
+    return seq.strip('.')
+
+
+def _fasta_record(index):
+    loop = "A" * (index % 7 + 3)
+    return (f">seq{index}|note\n"
+            f"gggaaa{loop}uuuccc\n"
+            f"((((((" + "." * len(loop) + f")))))) (-3.{index % 10})\n")
+
+
+def test_record_chunks_end_on_record_boundaries(tmp_path, monkeypatch):
+    monkeypatch.setattr(forest_core, "_FASTA_CHUNK_SIZE", 64)
+    data = "".join(_fasta_record(i) for i in range(50)).encode()
+    path = tmp_path / "in.fa"
+    path.write_bytes(data)
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunks = list(_iter_record_chunks(mm))
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith(b">") for chunk in chunks)
+    assert b"\n".join(chunks) == data
+
+
+@pytest.mark.parametrize("shift", [3, 4, 5, 6, 40])
+def test_parse_matches_line_parser_across_the_chunk_split(tmp_path, shift):
+    # Pad the second record so the third one's "\n>" lands on or around
+    # the 4 MiB split (shift 5 puts its newline exactly at the split)
+    chunk_size = forest_core._FASTA_CHUNK_SIZE
+    head = _fasta_record(0)
+    filler = ">filler\n" + "A" * (chunk_size - len(head) - 20 + shift) + "\n((..))\n"
+    records = [head, filler] + [_fasta_record(i) for i in range(1, 200)]
+    path = tmp_path / "big.fa"
+    path.write_text("".join(records))
+
+    parsed = parse_fasta_with_structure(path)
+    assert parsed == _reference_parse(path)
+    assert len(parsed) == 201
+    assert list(iter_fasta_with_structure(path)) == parsed
+
+
+def test_parse_handles_crlf_blank_lines_and_empty_files(tmp_path):
+    path = tmp_path / "in.fa"
+    path.write_bytes(b">a|x\r\n\r\nacgu\r\n((..)) &[]\r\n>incomplete\r\nACGU\r\n>b\nGGCC\n(..)\n")
+    assert parse_fasta_with_structure(path) == [(">a", "ACGU", "((..))"), (">b", "GGCC", "(..)")]
+
+    empty = tmp_path / "empty.fa"
+    empty.write_bytes(b"")
+    assert parse_fasta_with_structure(empty) == []
+
+
+def test_revcom_matches_the_original_on_str_and_bytes():
+    for seq in _random_sequences(500) + ["", "ACGU", "aéu", "straße"]:
+        expected = _reference_revcom(seq)
+        assert revcom(seq) == expected
+        if seq.isascii():
+            assert revcom(seq.encode()) == expected.encode()
+
+
+def test_revcom_bytes_returns_bytes():
+    assert revcom(b"AACGu") == b"ACGTT"
+    assert revcom("AACGu") == "ACGTT"
+
+
+@pytest.mark.parametrize("seqs", [
+    _random_sequences(300),
+    [],
+    [""],
+    ["", "", ""],
+    ["ACGT", "aé", "GGU"],      # non-ASCII input takes the per-sequence path
+    ["AC\nGT", "UUA"],           # an embedded newline breaks the batch split
+])
+def test_revcom_many_matches_revcom(seqs):
+    assert revcom_many(seqs) == [revcom(seq) for seq in seqs]
+
+
+def test_nth_find_and_rfind():
+    seq = "(.(..)(("
+    assert [_nth_find(seq, "(", n) for n in range(1, 6)] == [0, 2, 6, 7, -1]
+    assert [_nth_rfind(seq, "(", n) for n in range(1, 6)] == [7, 6, 2, 0, -1]
+    assert _nth_find("", "(", 1) == _nth_rfind("", "(", 1) == -1
+
+
+def test_hitpoint_helpers_match_the_original():
+    structures = _random_sequences(400, alphabet="((()))..", seed=1)
+    for seq in structures:
+        for hitpoint in range(-2, 8):
+            assert hitpoint_brew(hitpoint, seq) == _reference_hitpoint_brew(hitpoint, seq)
+            for bracket in ("(", ")", "."):
+                assert (hitpoint_counter(hitpoint, seq, bracket)
+                        == _reference_hitpoint_counter(hitpoint, seq, bracket)), (hitpoint, seq, bracket)
+
+
+def test_packman_matches_the_original():
+    structures = _random_sequences(2000, alphabet="((()))...", seed=2)
+    structures += ["", "((()))", "((..))", "(((...)))..(..)", "..((..)).."]
+    for seq in structures:
+        assert packman(seq) == _reference_packman(seq), seq
+
+
+def _duplicated_records():
+    structures = ["((((...))))..((...))", "(((..(((...)))..(((...))))))", "((...))"]
+    records = []
+    for i in range(30):
+        structure = structures[i % len(structures)]
+        sequence = "GCAUGCAUGCAUGCAUGCAUGCAUGCAUGCAU"[:len(structure)]
+        records.append((f">seq{i}", sequence, structure))
+    return records
+
+
+def test_rename_motifs_swaps_only_the_name_prefix():
+    motifs = {"seq1_Motif_1": ("((..))", "GGAACC"), "seq1_Multi_1_ComplexLevel_1": ("(..)", "GAAC")}
+    assert _rename_motifs(motifs, "seq1", "seq10") == {
+        "seq10_Motif_1": ("((..))", "GGAACC"),
+        "seq10_Multi_1_ComplexLevel_1": ("(..)", "GAAC"),
+    }
+
+
+def test_duplicate_records_are_extracted_once(monkeypatch):
+    calls = []
+
+    def counting_extraction(name, seq, seq2, max_length=100):
+        calls.append(name)
+        return terminal_motif_extraction(name, seq, seq2, max_length)
+
+    monkeypatch.setattr(forest_core, "terminal_motif_extraction", counting_extraction)
+    records = _duplicated_records()
+    per_record = list(iter_record_motifs(records))
+
+    assert calls == ["seq0", "seq1", "seq2"]
+    assert per_record == [terminal_motif_extraction(name.lstrip(">"), structure, sequence)
+                          for name, sequence, structure in records]
+
+
+def test_pool_extraction_matches_serial(monkeypatch):
+    monkeypatch.setattr(forest_core, "_MIN_POOL_RECORDS", 1)
+    records = _duplicated_records()
+    assert extract_all_motifs(records, jobs=2) == extract_all_motifs(records, jobs=1)
+
+
+def test_load_barcodes_stops_at_max_barcodes(tmp_path):
+    path = tmp_path / "barcodes.txt"
+    path.write_text("# barcodes\n\nacgtacgt\nNNNN\n  GGGGCCCC \n" + "TTTTAAAA\n" * 50)
+
+    barcodes = load_barcodes(path)
+    assert barcodes[:2] == ["ACGTACGT", "GGGGCCCC"]
+    assert len(barcodes) == 52
+    for max_barcodes in (0, 1, 2, 10, 52, 100):
+        assert load_barcodes(path, max_barcodes=max_barcodes) == barcodes[:max_barcodes]
@@ -0,0 +1,166 @@
+"""Tests for the job manager's listing and log reading."""
+
+import asyncio
+import json
+
+import pytest
+
+from jobs import manager as manager_module
+from jobs.manager import JobManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return JobManager(tmp_path / "jobs")
+
+
+def _write_job(manager, job_id, status="completed", submitted_at="2024-01-01T00:00:00"):
+    manager._save_metadata(job_id, {
+        "job_id": job_id,
+        "job_name": f"forest_{job_id}",
+        "script": "/mcp/scripts/library_design.py",
+        "args": {},
+        "status": status,
+        "submitted_at": submitted_at,
+    })
+
+
+def _job_ids(result):
+    return [job["job_id"] for job in result["jobs"]]
+
+
+def test_list_jobs_sorts_newest_first_and_filters(manager):
+    _write_job(manager, "old", "completed", "2024-01-01T00:00:00")
+    _write_job(manager, "new", "failed", "2024-01-02T00:00:00")
+
+    assert _job_ids(manager.list_jobs()) == ["new", "old"]
+    assert _job_ids(manager.list_jobs("completed")) == ["old"]
+    assert manager.list_jobs("running")["total"] == 0
+    assert manager.list_jobs()["jobs"][0]["script"] == "library_design.py"
+
+
+def test_list_jobs_sees_added_and_removed_jobs(manager):
+    _write_job(manager, "a")
+    assert _job_ids(manager.list_jobs()) == ["a"]
+
+    _write_job(manager, "b", submitted_at="2024-01-02T00:00:00")
+    assert _job_ids(manager.list_jobs()) == ["b", "a"]
+
+    (manager.jobs_dir / "a" / "metadata.json").unlink()
+    (manager.jobs_dir / "a").rmdir()
+    assert _job_ids(manager.list_jobs()) == ["b"]
+
+
+def test_list_jobs_picks_up_metadata_written_later(manager):
+    job_dir = manager.jobs_dir / "late"
+    job_dir.mkdir()
+    assert manager.list_jobs()["total"] == 0
+
+    # Half-written metadata is skipped until the write completes
+    (job_dir / "metadata.json").write_text('{"job_id": "late", "sta')
+    assert manager.list_jobs()["total"] == 0
+
+    (job_dir / "metadata.json").write_text(json.dumps({
+        "job_id": "late", "status": "running", "submitted_at": "2024-01-01T00:00:00"
+    }))
+    assert _job_ids(manager.list_jobs("running")) == ["late"]
+
+
+def test_list_jobs_sees_status_changes(manager):
+    _write_job(manager, "a", "running")
+    assert _job_ids(manager.list_jobs("running")) == ["a"]
+
+    _write_job(manager, "a", "completed")
+    assert manager.list_jobs("running")["total"] == 0
+    assert _job_ids(manager.list_jobs("completed")) == ["a"]
+
+
+def test_async_wrappers_run_concurrently_with_saves(manager):
+    for i in range(20):
+        _write_job(manager, f"job{i}", "running")
+
+    async def poll_and_finish():
+        saves = [asyncio.to_thread(_write_job, manager, f"job{i}", "completed") for i in range(20)]
+        polls = [manager.aget_job_status(f"job{i}") for i in range(20)]
+        await asyncio.gather(*saves, *polls, manager.alist_jobs())
+        return await manager.alist_jobs("completed")
+
+    assert asyncio.run(poll_and_finish())["total"] == 20
+
+
+def _readlines(path):
+    with open(path) as f:
+        return f.readlines()
+
+
+@pytest.mark.parametrize("ending", ["\n", "\r\n", "\r"])
+@pytest.mark.parametrize("tail", [1, 5, 2000])
+def test_tail_lines_across_block_boundaries(manager, tmp_path, ending, tail):
+    # Lines of varying length so line endings straddle the 64 KB blocks,
+    # and no final line ending
+    lines = [f"step {i} " + "x" * (i % 97) for i in range(6000)]
+    log_file = tmp_path / "job.log"
+    log_file.write_bytes(ending.join(lines).encode())
+    assert log_file.stat().st_size > 3 * manager_module._LOG_BLOCK_SIZE
+
+    assert manager._tail_lines(log_file, tail) == _readlines(log_file)[-tail:]
+
+
+def test_tail_lines_with_a_crlf_split_across_blocks(manager, tmp_path):
+    block = manager_module._LOG_BLOCK_SIZE
+    log_file = tmp_path / "job.log"
+    # The \r of the last line break ends one block read back from the end,
+    # and its \n starts the next
+    log_file.write_bytes(b"a" * 10 + b"\r\n" + b"b" * (block - 1) + b"\r\n" + b"c" * (block - 1))
+
+    assert manager._tail_lines(log_file, 2) == _readlines(log_file)[-2:]
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"one",
+    b"one\ntwo\n",
+    b"one\r\ntwo\r\nthree",
+    b"progress 1\rprogress 2\rdone\n",
+    b"\r\n\r\n\n\r",
+])
+def test_count_lines_matches_readlines(manager, tmp_path, data):
+    log_file = tmp_path / "job.log"
+    log_file.write_bytes(data)
+    assert manager._count_lines(log_file) == len(_readlines(log_file))
+
+
+def test_count_lines_with_a_crlf_split_across_reads(manager, tmp_path):
+    block = manager_module._LOG_BLOCK_SIZE
+    log_file = tmp_path / "job.log"
+    log_file.write_bytes(b"a" * (block - 1) + b"\r\n" + b"b\r\n" * 10)
+    assert manager._count_lines(log_file) == len(_readlines(log_file)) == 11
+
+
+def test_count_lines_follows_a_growing_log(manager, tmp_path):
+    log_file = tmp_path / "job.log"
+    log_file.write_bytes(b"one\r")
+    assert manager._count_lines(log_file) == 1
+
+    # The \n completes the \r\n already counted, so it adds no line
+    with open(log_file, 'ab') as f:
+        f.write(b"\ntwo\nthr")
+    assert manager._count_lines(log_file) == 3
+
+    with open(log_file, 'ab') as f:
+        f.write(b"ee\n")
+    assert manager._count_lines(log_file) == len(_readlines(log_file)) == 3
+
+    # A rewritten, shorter log is counted afresh
+    log_file.write_bytes(b"new\n")
+    assert manager._count_lines(log_file) == 1
+
+
+def test_count_lines_cache_is_bounded(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(manager_module, "_LOG_COUNT_CACHE_SIZE", 3)
+    for i in range(5):
+        log_file = tmp_path / f"{i}.log"
+        log_file.write_bytes(b"line\n" * i)
+        assert manager._count_lines(log_file) == i
+
+    assert list(manager._log_line_counts) == [str(tmp_path / f"{i}.log") for i in (2, 3, 4)]